@@ -0,0 +1,29 @@
+import pytest
+
+from benchmarks.synthetic import personal_charts
+from charts import render_chart, render_charts_batch
+from parser import _chart_data, parse_hours_matrix
+
+
+def test_render_team_chart(benchmark, employees, report_html):
+    data = _chart_data(parse_hours_matrix(report_html))
+    assert benchmark(render_chart, data).startswith(b"\x89PNG")
+
+
+@pytest.mark.benchmark(group="personal charts")
+@pytest.mark.parametrize("subscribers", [10, 50])
+def test_render_personal_charts_batch(benchmark, subscribers):
+    datasets = personal_charts(subscribers)
+    images = benchmark.pedantic(render_charts_batch, args=(datasets,), rounds=3)
+    assert len(images) == subscribers
+
+
+@pytest.mark.benchmark(group="personal charts")
+@pytest.mark.parametrize("subscribers", [10, 50])
+def test_render_personal_charts_figure_per_chart(benchmark, subscribers):
+    # What the batch renderer replaced: a new figure for every chart
+    datasets = personal_charts(subscribers)
+    images = benchmark.pedantic(
+        lambda: [render_chart(data) for data in datasets], rounds=3
+    )
+    assert len(images) == subscribers
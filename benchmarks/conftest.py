@@ -0,0 +1,41 @@
+import pytest
+
+import charts
+import config
+from benchmarks.stub_redmine import StubRedmine
+from benchmarks.synthetic import generate_employees, generate_report_html
+from schema import ConfigModel
+
+# (employees, days): from a small team's week to a large department's month
+SIZES = [(10, 7), (50, 31), (500, 31)]
+
+
+def pytest_generate_tests(metafunc):
+    if "size" in metafunc.fixturenames:
+        metafunc.parametrize("size", SIZES, ids=[f"{e}x{d}" for e, d in SIZES])
+
+
+@pytest.fixture
+def employees(size, monkeypatch):
+    employees = generate_employees(*size)
+    # Replaces config.json, so benchmarks don't depend on the local config
+    monkeypatch.setitem(vars(config), "EMPLOYEES", employees)
+    monkeypatch.setitem(vars(config), "config", ConfigModel(employees=employees))
+    return employees
+
+
+@pytest.fixture
+def report_html(size):
+    return generate_report_html(*size)
+
+
+@pytest.fixture(scope="session")
+def stub_redmine():
+    with StubRedmine() as redmine:
+        yield redmine
+
+
+@pytest.fixture(scope="session", autouse=True)
+def chart_executor():
+    yield
+    charts.shutdown_chart_executor()
@@ -0,0 +1,35 @@
+from functools import partial
+
+import redmine
+from redmine import fetch_report_http
+from snapshot import build_report_snapshot
+from teams import Team
+
+
+def test_fetch_report_http(benchmark, size, stub_redmine):
+    result = benchmark(
+        fetch_report_http,
+        stub_redmine.report_url(*size),
+        stub_redmine.login_url,
+        stub_redmine.username,
+        stub_redmine.password,
+    )
+    assert result.page_source.count('class="last-level"') == size[0]
+
+
+def test_build_report_snapshot(benchmark, size, employees, stub_redmine, monkeypatch):
+    # Login, download and parse, as one scheduled run does it
+    monkeypatch.setattr(redmine, "REDMINE_FETCHER", "http")
+    monkeypatch.setitem(
+        redmine.FETCHERS,
+        "http",
+        partial(
+            fetch_report_http,
+            login_url=stub_redmine.login_url,
+            username=stub_redmine.username,
+            password=stub_redmine.password,
+        ),
+    )
+    team = Team("bench", stub_redmine.report_url(*size), "-1", employees)
+    snapshot = benchmark(build_report_snapshot, team)
+    assert len(snapshot.work_hours) == size[0]
@@ -0,0 +1,72 @@
+import pytest
+from bs4 import BeautifulSoup, Tag
+
+import charts
+import config
+from parser import (
+    _prepare_hours_report,
+    extract_last_level_rows,
+    format_hours_report,
+    parse_hours_matrix,
+    parse_time_entries,
+)
+
+
+def test_extract_last_level_rows(benchmark, size, report_html):
+    rows = benchmark(extract_last_level_rows, report_html)
+    assert rows.count('class="last-level"') == size[0]
+
+
+def beautifulsoup_parse(page_html: str) -> dict[str, list[str]]:
+    # extract_last_level_rows + parse_time_entries as they were before
+    soup = BeautifulSoup(page_html, "html.parser")
+    rows_html = "\n".join(str(row) for row in soup.find_all("tr", class_="last-level"))
+    work_hours: dict[str, list[str]] = {}
+    for row in BeautifulSoup(rows_html, "html.parser").find_all(
+        "tr", class_="last-level"
+    ):
+        name_td = row.find("td", class_="name")
+        if not isinstance(name_td, Tag):
+            continue
+        name = " ".join(name_td.get_text(strip=True).split())
+        hours = []
+        for cell in row.find_all("td", class_="hours"):
+            span = cell.find("span", class_="hours-int")
+            hours.append(span.get_text(strip=True) if span else "0")
+        if name in config.EMPLOYEES:
+            work_hours[name] = hours
+    return work_hours
+
+
+@pytest.mark.benchmark(group="parse_time_entries")
+def test_parse_time_entries(benchmark, size, employees, report_html):
+    assert len(benchmark(parse_time_entries, report_html)) == size[0]
+
+
+@pytest.mark.benchmark(group="parse_time_entries")
+def test_parse_time_entries_beautifulsoup(benchmark, size, employees, report_html):
+    # The two-parse BeautifulSoup path the single-pass parser replaced
+    work_hours = benchmark.pedantic(beautifulsoup_parse, args=(report_html,), rounds=3)
+    assert work_hours == parse_time_entries(report_html)
+
+
+def test_parse_hours_matrix(benchmark, size, employees, report_html):
+    assert benchmark(parse_hours_matrix, report_html).days_count == size[1]
+
+
+def test_prepare_hours_report(benchmark, employees, report_html):
+    # Report text plus the vacation-aware underworked check, without the chart
+    work_hours = parse_hours_matrix(report_html)
+    assert benchmark(_prepare_hours_report, work_hours).text
+
+
+def test_format_hours_report(benchmark, employees, report_html):
+    # The chart cache is cleared before every round so rendering is measured
+    report = benchmark.pedantic(
+        format_hours_report,
+        args=(report_html,),
+        setup=charts._cache.clear,
+        rounds=5,
+        warmup_rounds=1,
+    )
+    assert report.image
@@ -0,0 +1,135 @@
+"""A local Redmine stand-in serving the login form and report pages.
+
+Used by the benchmarks and by the HTTP fetcher tests. By default it serves
+synthetic reports at ``/report/<employees>x<days>``, generated on first
+request and cached, so a benchmark measures the client, not the generator::
+
+    with StubRedmine() as redmine:
+        fetch_report_http(redmine.report_url(500, 31), redmine.login_url,
+                          redmine.username, redmine.password)
+"""
+
+import re
+import threading
+from collections.abc import Callable
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from benchmarks.synthetic import generate_report_html
+
+TOKEN = "stub-token"
+SESSION = "stub-session"
+USERNAME = "bench"
+PASSWORD = "bench"
+# Redmine's markup: the id is on the wrapping <div>, not on the <form>
+LOGIN_HTML = f"""
+<div id="login-form">
+  <form action="/login" method="post">
+    <input type="hidden" name="authenticity_token" value="{TOKEN}" />
+    <input type="text" name="username" id="username" />
+    <input type="password" name="password" id="password" />
+    <input type="submit" name="login" value="Login" id="login-submit" />
+  </form>
+</div>
+"""
+REPORT_PATH = re.compile(r"^/report/(\d+)x(\d+)$")
+
+
+@lru_cache(maxsize=16)
+def _report(employees: int, days: int) -> bytes:
+    return generate_report_html(employees, days).encode()
+
+
+def synthetic_report(path: str) -> bytes | None:
+    match = REPORT_PATH.match(path)
+    return _report(int(match[1]), int(match[2])) if match else None
+
+
+class _StubServer(ThreadingHTTPServer):
+    stub: "StubRedmine"
+
+
+class StubRedmineHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: _StubServer
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes = b"", headers=None) -> None:
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _has_session(self) -> bool:
+        return f"_redmine_session={SESSION}" in self.headers.get("Cookie", "")
+
+    def do_GET(self):
+        if self.path == "/login":
+            self._send(
+                200, LOGIN_HTML.encode(), {"Set-Cookie": "_redmine_session=anon"}
+            )
+        elif not self._has_session():
+            self._send(302, headers={"Location": "/login"})
+        elif self.path == "/my/page":
+            self._send(200, b"<h2>My page</h2>")
+        elif (report := self.server.stub.report(self.path)) is not None:
+            self._send(200, report)
+        else:
+            self._send(404)
+
+    def do_POST(self):
+        stub = self.server.stub
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode())
+        if (
+            form.get("authenticity_token") == [TOKEN]
+            and form.get("username") == [stub.username]
+            and form.get("password") == [stub.password]
+        ):
+            self._send(
+                302,
+                headers={
+                    "Location": "/my/page",
+                    "Set-Cookie": f"_redmine_session={SESSION}",
+                },
+            )
+        else:
+            self._send(200, LOGIN_HTML.encode())
+
+
+class StubRedmine:
+    def __init__(
+        self,
+        report: Callable[[str], bytes | None] = synthetic_report,
+        username: str = USERNAME,
+        password: str = PASSWORD,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.report = report
+        self.username = username
+        self.password = password
+        self.server = _StubServer((host, port), StubRedmineHandler)
+        self.server.stub = self
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_port}"
+        self.login_url = f"{self.url}/login"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def report_url(self, employees: int, days: int) -> str:
+        return f"{self.url}/report/{employees}x{days}"
+
+    def __enter__(self) -> "StubRedmine":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,104 @@
+import random
+from datetime import date, timedelta
+
+from charts import ChartData
+from schema import EmployeeData
+
+WHOLE_HOURS = (0, 0, 4, 6, 8, 8, 8, 9)
+FRACTIONAL_HOURS = (0, 0, 4, 6, 7.5, 8, 8, 8.25)
+
+
+def employee_names(employees: int) -> list[str]:
+    return [f"Employee{index:04d} Surname{index:04d}" for index in range(employees)]
+
+
+def generate_employees(
+    employees: int = 500,
+    days: int = 31,
+    vacation_share: float = 0.1,
+    part_time_share: float = 0.2,
+    end: date | None = None,
+    seed: int = 0,
+) -> dict[str, EmployeeData]:
+    """Config entries for ``employee_names``, some part-time, some on vacation.
+
+    Vacations overlap the report window of ``days`` ending on ``end``, so the
+    calendar code has to trim them.
+    """
+    rng = random.Random(seed)
+    end = end or date.today()
+    start = end - timedelta(days=days - 1)
+    result = {}
+    for name in employee_names(employees):
+        vacation_range = None
+        if rng.random() < vacation_share:
+            first = start + timedelta(days=rng.randrange(-7, days))
+            vacation_range = [first, first + timedelta(days=rng.randrange(1, 15))]
+        result[name] = EmployeeData(
+            tg=f"@{name.split()[0].lower()}",
+            rate=rng.choice((0.5, 0.75)) if rng.random() < part_time_share else 1.0,
+            vacation_range=vacation_range,
+        )
+    return result
+
+
+def _hours_cell(hours: float) -> str:
+    if not hours:
+        return '<td class="hours"></td>'
+    minutes = round(hours % 1 * 60)
+    return (
+        '<td class="hours">'
+        f'<span class="hours hours-int">{int(hours)}</span>'
+        f'<span class="hours hours-dec">:{minutes:02d}</span>'
+        "</td>"
+    )
+
+
+def generate_hours(
+    employees: int = 500, days: int = 31, fractional: bool = True, seed: int = 0
+) -> dict[str, list[float]]:
+    rng = random.Random(seed)
+    choices = FRACTIONAL_HOURS if fractional else WHOLE_HOURS
+    return {
+        name: [rng.choice(choices) for _ in range(days)]
+        for name in employee_names(employees)
+    }
+
+
+def generate_report_html(
+    employees: int = 500, days: int = 31, seed: int = 0, fractional: bool = True
+) -> str:
+    rows = []
+    for name, daily in generate_hours(employees, days, fractional, seed).items():
+        cells = "".join(_hours_cell(hours) for hours in daily)
+        rows.append(
+            '<tr class="last-level">'
+            f'<td class="name"><a href="/users/1">{name}</a></td>'
+            f"{cells}{_hours_cell(sum(daily))}"
+            "</tr>"
+        )
+    header = "".join(f"<th>{day + 1}</th>" for day in range(days))
+    return (
+        "<html><body><div id='content'><table class='list' id='time-report'>"
+        f"<thead><tr><th>User</th>{header}<th>Total</th></tr></thead>"
+        f"<tbody>{''.join(rows)}</tbody></table></div></body></html>"
+    )
+
+
+def personal_charts(subscribers: int, seed: int = 0) -> list[ChartData]:
+    """One single-employee chart per subscriber, as personal reports send them."""
+    rng = random.Random(seed)
+    charts = []
+    for name in employee_names(subscribers):
+        hours = rng.choice((0.0, 12.0, 24.5, 32.0, 40.0, 41.25))
+        charts.append(
+            ChartData(
+                names=(name.split()[0],),
+                hours=(hours,),
+                labels=(f"{hours:g}",),
+                colors=(rng.choice(("skyblue", "hotpink", "mediumpurple")),),
+                norm=40,
+                legend=("Weekly norm", "50% of norm", "Weekends"),
+            )
+        )
+    return charts
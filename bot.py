@@ -1,42 +1,59 @@
+import startup  # first, so startup timing covers every other import
+
+import argparse
 import asyncio
 import datetime
-import json
 import logging
 import os
-from functools import partial
-import holidays
+from collections import defaultdict
+from functools import lru_cache, partial
 
 from aiogram import Bot, Dispatcher
+from aiogram.exceptions import TelegramAPIError
 from aiogram.types import BufferedInputFile
 from apscheduler.schedulers.asyncio import AsyncIOScheduler  # type: ignore
 from apscheduler.triggers.cron import CronTrigger  # type: ignore
-from bs4 import BeautifulSoup
 
 from config import (
     BOT_TOKEN,
-    SCHEDULE_TIME,
-    SCHEDULE_DAYS,
     SCHEDULE_MISFIRE_GRACE_TIME,
     SCHEDULE_COALESCE,
-    TELEGRAM_CHAT_ID,
     LANG,
-    SUBSCRIBERS_FILE,
-    EMPLOYEES,
-    SCHEDULE_TIME_PERSONAL,
+    PRAISE_REFILL_TIME,
+    REDMINE_FETCHER,
 )
 from aiohttp import TCPConnector
+from charts import shutdown_chart_executor
+from conversations import conversation_store
+from delivery import Delivery, DeliveryPipeline
 from handlers import register_handlers
-from parser import extract_last_level_rows, format_hours_report
+from history import hours_history
+from llm import llm_client
+from llm_cache import llm_cache
+from metrics import (
+    stage_seconds,
+    start_metrics_server,
+    subscriber_count,
+    telegram_errors,
+)
+from parser import (
+    HoursReport,
+    build_hours_report_async,
+    build_hours_reports_batch_async,
+)
+from praise_pool import praise_pool
 from praise_team import praise_team
-from redmine import fetch_page_source
+from redmine import driver_pool, prepare_webdriver
+from snapshot import get_report_snapshot_async
+from subscribers import subscriber_store
+from teams import Team, default_team, load_teams
 from translations import t, set_language
+from work_calendar import holidays_ru
 
 dp = Dispatcher()
 scheduler = AsyncIOScheduler()
 set_language(LANG)
 
-holidays_ru = holidays.country_holidays("RU")
-
 
 def validate_env_vars():
     required_vars = [
@@ -44,8 +61,6 @@ def validate_env_vars():
         "REDMINE_USERNAME",
         "REDMINE_PASSWORD",
         "BOT_TOKEN",
-        "TELEGRAM_CHAT_ID",
-        "REPORT_URL",
         "CONFIG_PATH",
         "LANG",
     ]
@@ -57,138 +72,184 @@ def validate_env_vars():
 validate_env_vars()
 
 
-def is_working_day() -> bool:
-    today = datetime.date.today()
-    return today.weekday() < 5 and today not in holidays_ru
+@lru_cache(maxsize=16)
+def _is_working_date(day: datetime.date) -> bool:
+    return day.weekday() < 5 and day not in holidays_ru
 
 
-def start_scheduler(bot: Bot, SCHEDULE_TIME_PERSONALME=None) -> None:
-    if is_working_day():
-        scheduler.add_job(
-            partial(scheduled_time_check, bot),
-            trigger=CronTrigger(
-                hour=SCHEDULE_TIME.hour,
-                minute=SCHEDULE_TIME.minute,
-                day_of_week=SCHEDULE_DAYS,
-                timezone=SCHEDULE_TIME.timezone,
-            ),
-            misfire_grace_time=SCHEDULE_MISFIRE_GRACE_TIME,
-            coalesce=SCHEDULE_COALESCE,
-        )
-        scheduler.add_job(
-            partial(scheduled_personal_time_check, bot),
-            trigger=CronTrigger(
-                hour=SCHEDULE_TIME_PERSONAL.hour,
-                minute=SCHEDULE_TIME_PERSONAL.minute,
-                day_of_week=SCHEDULE_DAYS,
-                timezone=SCHEDULE_TIME_PERSONAL.timezone,
-            ),
-            misfire_grace_time=SCHEDULE_MISFIRE_GRACE_TIME,
-            coalesce=SCHEDULE_COALESCE,
-        )
-        scheduler.start()
-    else:
-        print("Skipping scheduler because it's a weekend or holiday.")
+def is_working_day(day: datetime.date | None = None) -> bool:
+    return _is_working_date(day or datetime.date.today())
 
 
-async def scheduled_time_check_by_user(bot, user_id, username):
-    page_html: str = fetch_page_source()
-    time_entries_html: str = extract_last_level_rows(page_html)
+# One lock per team: its group and personal runs never overlap, while
+# different teams still run side by side.
+_team_locks: defaultdict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
 
-    target_name: str = ""
-    for name in EMPLOYEES:
-        if EMPLOYEES[name].tg == "@" + username:
-            target_name = name
 
-    if not target_name:
+async def run_team_job(job, bot: Bot, team: Team, tz) -> None:
+    # Cron only knows weekdays, so holidays are checked when the job fires
+    today = datetime.datetime.now(tz).date()
+    if not is_working_day(today):
+        logging.info(f"Skipping {job.__name__} ({team.name}): {today} is a day off")
         return
+    async with _team_locks[team.name]:
+        await job(bot, team)
 
-    soup = BeautifulSoup(time_entries_html, "html.parser")
-    rows = soup.find_all("tr", class_="last-level")
-
-    target_row = None
-    for row in rows:
-        name_link = row.find("a")
-        if name_link and name_link.get_text().strip() == target_name:
-            target_row = row
-            break
-
-    if not target_row:
-        return
 
-    new_soup = BeautifulSoup("<table></table>", "html.parser")
-    table = new_soup.find("table")
-    if table:
-        table.append(target_row)
+def add_team_jobs(bot: Bot, team: Team) -> None:
+    # Job ids keep teams apart in the scheduler; jobs of different teams
+    # run concurrently and only share the report fetch executor.
+    for job_id, job, time_config in (
+        ("group", scheduled_time_check, team.schedule_time),
+        ("personal", scheduled_personal_time_check, team.personal_schedule_time),
+    ):
+        scheduler.add_job(
+            partial(run_team_job, job, bot, team, time_config.timezone),
+            trigger=CronTrigger(
+                hour=time_config.hour,
+                minute=time_config.minute,
+                day_of_week=team.schedule_days,
+                timezone=time_config.timezone,
+            ),
+            id=f"{team.name}:{job_id}",
+            misfire_grace_time=SCHEDULE_MISFIRE_GRACE_TIME,
+            coalesce=SCHEDULE_COALESCE,
+        )
 
-    hours_report = format_hours_report(str(new_soup))
 
-    if hours_report.image:
-        image_file = BufferedInputFile(
-            hours_report.image, filename="work_hours_chart.png"
-        )
-        await bot.send_photo(
-            user_id,
-            photo=image_file,
-            caption=hours_report.text,
-            parse_mode="HTML",
-        )
-    else:
-        await bot.send_message(user_id, hours_report.text, parse_mode="HTML")
-
-
-async def scheduled_personal_time_check(bot: Bot) -> None:
-    with open(SUBSCRIBERS_FILE, encoding="utf-8") as f:
-        subscribers_data = json.load(f)
-        for user_id, user_data in subscribers_data.items():
-            try:
-                subscribe_status = user_data["subscribe"]
-                username = user_data["username"]
-                if subscribe_status:
-                    await scheduled_time_check_by_user(
-                        bot=bot, user_id=user_id, username=username
-                    )
-            except Exception as e:
-                logging.error(f"Error processing user {user_id}: {e}")
-                continue
-
-
-async def scheduled_time_check(bot: Bot) -> None:
+def start_scheduler(bot: Bot) -> None:
+    for team in load_teams():
+        add_team_jobs(bot, team)
+    # Off-peak refill, plus one right away so the pool is ready today
+    scheduler.add_job(
+        praise_pool.refill,
+        trigger=CronTrigger(
+            hour=PRAISE_REFILL_TIME.hour,
+            minute=PRAISE_REFILL_TIME.minute,
+            timezone=PRAISE_REFILL_TIME.timezone,
+        ),
+        next_run_time=datetime.datetime.now(PRAISE_REFILL_TIME.timezone),
+        coalesce=SCHEDULE_COALESCE,
+    )
+    scheduler.start()
+
+
+async def send_hours_report(bot, chat_id, hours_report: HoursReport) -> None:
     try:
-        page_html: str = fetch_page_source()
-        time_entries_html: str = extract_last_level_rows(page_html)
-        hours_report = format_hours_report(time_entries_html)
-
-        if hours_report.has_missing:
+        with stage_seconds.labels(stage="send").time():
             if hours_report.image:
                 image_file = BufferedInputFile(
                     hours_report.image, filename="work_hours_chart.png"
                 )
                 await bot.send_photo(
-                    TELEGRAM_CHAT_ID,
+                    chat_id,
                     photo=image_file,
                     caption=hours_report.text,
                     parse_mode="HTML",
                 )
             else:
-                await bot.send_message(
-                    TELEGRAM_CHAT_ID, hours_report.text, parse_mode="HTML"
-                )
+                await bot.send_message(chat_id, hours_report.text, parse_mode="HTML")
+    except TelegramAPIError as error:
+        telegram_errors.labels(error=type(error).__name__).inc()
+        raise
+
+
+async def scheduled_personal_time_check(bot: Bot, team: Team | None = None) -> None:
+    team = team or default_team()
+    try:
+        snapshot = await get_report_snapshot_async(team=team)
+    except Exception as e:
+        logging.error(f"Error fetching report for personal check ({team.name}): {e}")
+        return
+    slices = {}
+    for subscriber in await subscriber_store.active_subscribers_async():
+        if not subscriber.username:
+            continue
+        work_hours = snapshot.hours_for_telegram(subscriber.username)
+        if work_hours is not None:
+            slices[subscriber.user_id] = work_hours
+    reports = await build_hours_reports_batch_async(slices, employees=team.employees)
+    deliveries = [
+        Delivery(
+            chat_id=user_id,
+            send=partial(
+                send_hours_report, bot=bot, chat_id=user_id, hours_report=report
+            ),
+        )
+        for user_id, report in reports.items()
+    ]
+    stats = await DeliveryPipeline().deliver(deliveries)
+    logging.info(f"Personal reports ({team.name}): {stats}")
+
+
+async def scheduled_time_check(bot: Bot, team: Team | None = None) -> None:
+    team = team or default_team()
+    try:
+        snapshot = await get_report_snapshot_async(team=team)
+        hours_report = await build_hours_report_async(
+            snapshot.work_hours, employees=team.employees
+        )
+
+        if hours_report.has_missing:
+            await send_hours_report(bot, team.chat_id, hours_report)
         else:
-            await bot.send_message(TELEGRAM_CHAT_ID, praise_team())
+            await bot.send_message(team.chat_id, await praise_team())
+    except Exception as error:
+        logging.error(f"Error in scheduled_time_check ({team.name}): {error}")
+        await bot.send_message(team.chat_id, f"❗ {t('error')}: {error}")
+
+
+async def resolve_webdriver() -> None:
+    try:
+        await asyncio.to_thread(prepare_webdriver)
     except Exception as error:
-        logging.error(f"Error in scheduled_time_check: {error}")
-        await bot.send_message(TELEGRAM_CHAT_ID, f"❗ {t('error')}: {error}")
+        logging.warning(f"Could not resolve ChromeDriver at startup: {error}")
 
 
-async def main():
+async def main(startup_report: bool = False):
+    startup.mark("imports")
     connector = TCPConnector(ttl_dns_cache=300)
     bot = Bot(token=BOT_TOKEN, connector=connector)
 
     register_handlers(dp)
     start_scheduler(bot)
-    await dp.start_polling(bot)
+    subscriber_count.set(await subscriber_store.count_async())
+    metrics_runner = await start_metrics_server(health=lambda: scheduler.running)
+    startup.mark("handlers and scheduler")
+    background: set[asyncio.Task] = set()
+
+    async def on_startup():
+        startup.mark("polling")
+        # Off the pre-polling path; the HTTP fetcher resolves ChromeDriver
+        # on its first Selenium fallback instead
+        if REDMINE_FETCHER == "selenium":
+            task = asyncio.create_task(resolve_webdriver())
+            background.add(task)
+            task.add_done_callback(background.discard)
+        if startup_report:
+            report = await asyncio.to_thread(startup.startup_report)
+            print(report, flush=True)
+
+    dp.startup.register(on_startup)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        shutdown_chart_executor()
+        driver_pool.close()
+        subscriber_store.close()
+        conversation_store.close()
+        hours_history.close()
+        await llm_client.close()
+        llm_cache.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    arguments = argparse.ArgumentParser(description="Redmine work hours bot")
+    arguments.add_argument(
+        "--startup-report",
+        action="store_true",
+        help="print startup phase timings and the slowest imports once polling starts",
+    )
+    asyncio.run(main(startup_report=arguments.parse_args().startup_report))
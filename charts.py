@@ -0,0 +1,250 @@
+import asyncio
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable, Mapping
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, TypeVar
+
+from config import CHART_CACHE_SIZE, CHART_EXECUTOR, CHART_WORKERS
+
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Rectangle
+    from matplotlib.text import Text
+
+# Headless backend chosen before matplotlib is ever imported (also inherited by
+# the render worker processes); matplotlib itself loads on the first render.
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+K = TypeVar("K", bound=Hashable)
+
+
+@dataclass(frozen=True)
+class ChartData:
+    names: tuple[str, ...]
+    hours: tuple[float, ...]
+    labels: tuple[str, ...]
+    colors: tuple[str, ...]
+    norm: float
+    legend: tuple[str, str, str]
+
+    def digest(self) -> str:
+        return hashlib.sha256(repr(self).encode()).hexdigest()
+
+
+def _draw_chart(
+    axes: "Axes", data: ChartData
+) -> tuple[list["Rectangle"], list["Text"]]:
+    weekly_norm, half_norm, non_working_days = data.legend
+    bars = axes.bar(data.names, data.hours, color=data.colors, width=0.6)
+    axes.axhline(y=data.norm, color="skyblue", linestyle="--", label=weekly_norm)
+    axes.axhline(y=data.norm / 2, color="mediumpurple", linestyle="--", label=half_norm)
+    axes.plot(
+        [],
+        [],
+        color="hotpink",
+        marker="s",
+        linestyle="None",
+        markersize=8,
+        label=non_working_days,
+    )
+    axes.tick_params(axis="x", labelrotation=30, labelsize=9)
+    axes.tick_params(axis="y", labelsize=9)
+    for tick in axes.get_xticklabels():
+        tick.set_horizontalalignment("right")
+    axes.legend(fontsize=9, loc="lower right", framealpha=0.3)
+    texts = [
+        axes.text(
+            bar.get_x() + bar.get_width() / 2,
+            bar.get_height() + 0.5,
+            label,
+            ha="center",
+            va="bottom",
+            fontsize=9,
+        )
+        for bar, label in zip(bars, data.labels)
+    ]
+    return list(bars), texts
+
+
+def _new_figure() -> tuple["Figure", "Axes"]:
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    # Object-oriented API only: no pyplot state, safe in threads and processes
+    figure = Figure(figsize=(5, 3))
+    FigureCanvasAgg(figure)
+    return figure, figure.add_subplot()
+
+
+def _to_png(figure: "Figure") -> bytes:
+    buf = io.BytesIO()
+    # Telegram recompresses photos, so spend less time on zlib
+    figure.savefig(buf, format="png", dpi=100, pil_kwargs={"compress_level": 1})
+    return buf.getvalue()
+
+
+def render_chart(data: ChartData) -> bytes:
+    figure, axes = _new_figure()
+    _draw_chart(axes, data)
+    figure.tight_layout(pad=1)
+    return _to_png(figure)
+
+
+class _BatchRenderer:
+    """Renders many charts on one figure, updating artists between charts."""
+
+    def __init__(self):
+        self.figure, self.axes = _new_figure()
+        self.bars: list["Rectangle"] = []
+        self.texts: list["Text"] = []
+        self.layout: tuple | None = None
+
+    def _update(self, data: ChartData) -> None:
+        for bar, text, hours, label, color in zip(
+            self.bars, self.texts, data.hours, data.labels, data.colors
+        ):
+            bar.set_height(hours)
+            bar.set_color(color)
+            text.set_y(hours + 0.5)
+            text.set_text(label)
+        self.axes.set_xticks(range(len(data.names)), data.names)
+        for tick in self.axes.get_xticklabels():
+            tick.set_horizontalalignment("right")
+        self.axes.relim()
+        self.axes.autoscale_view()
+        self.figure.tight_layout(pad=1)
+
+    def render(self, data: ChartData) -> bytes:
+        layout = (len(data.names), data.norm, data.legend)
+        if layout == self.layout:
+            self._update(data)
+        else:
+            self.axes.clear()
+            self.bars, self.texts = _draw_chart(self.axes, data)
+            self.figure.tight_layout(pad=1)
+            self.layout = layout
+        return _to_png(self.figure)
+
+
+def render_charts_batch(datasets: list[ChartData]) -> list[bytes]:
+    renderer = _BatchRenderer()
+    return [renderer.render(data) for data in datasets]
+
+
+_cache: OrderedDict[str, bytes] = OrderedDict()
+_cache_lock = threading.Lock()
+_executor: Executor | None = None
+_executor_lock = threading.Lock()
+
+
+def _process_context() -> multiprocessing.context.BaseContext:
+    # Workers fork from a server that has loaded only this module, instead
+    # of each spawned worker starting from scratch
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([__name__])
+    return context
+
+
+def _get_executor() -> Executor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            if CHART_EXECUTOR == "thread":
+                _executor = ThreadPoolExecutor(max_workers=CHART_WORKERS)
+            else:
+                _executor = ProcessPoolExecutor(
+                    max_workers=CHART_WORKERS, mp_context=_process_context()
+                )
+        return _executor
+
+
+def _reset_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def shutdown_chart_executor() -> None:
+    _reset_executor()
+
+
+def _cached(key: str) -> bytes | None:
+    with _cache_lock:
+        image = _cache.get(key)
+        if image is not None:
+            _cache.move_to_end(key)
+        return image
+
+
+def _store(key: str, image: bytes) -> bytes:
+    with _cache_lock:
+        _cache[key] = image
+        _cache.move_to_end(key)
+        while len(_cache) > CHART_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return image
+
+
+def render_chart_cached(data: ChartData) -> bytes:
+    key = data.digest()
+    image = _cached(key)
+    if image is not None:
+        return image
+    try:
+        image = _get_executor().submit(render_chart, data).result()
+    except BrokenExecutor:
+        _reset_executor()
+        image = render_chart(data)
+    return _store(key, image)
+
+
+async def render_chart_async(data: ChartData) -> bytes:
+    key = data.digest()
+    image = _cached(key)
+    if image is not None:
+        return image
+    try:
+        image = await asyncio.wrap_future(_get_executor().submit(render_chart, data))
+    except BrokenExecutor:
+        _reset_executor()
+        image = await asyncio.to_thread(render_chart, data)
+    return _store(key, image)
+
+
+async def render_charts_batch_async(
+    datasets: Mapping[K, ChartData],
+) -> dict[K, bytes]:
+    digests = {key: data.digest() for key, data in datasets.items()}
+    images: dict[str, bytes] = {}
+    missing: dict[str, ChartData] = {}
+    for key, data in datasets.items():
+        image = _cached(digests[key])
+        if image is not None:
+            images[digests[key]] = image
+        else:
+            missing[digests[key]] = data
+    if missing:
+        # All uncached charts go to a single worker call
+        pending = list(missing.values())
+        try:
+            rendered = await asyncio.wrap_future(
+                _get_executor().submit(render_charts_batch, pending)
+            )
+        except BrokenExecutor:
+            _reset_executor()
+            rendered = await asyncio.to_thread(render_charts_batch, pending)
+        for digest, image in zip(missing, rendered):
+            images[digest] = _store(digest, image)
+    return {key: images[digest] for key, digest in digests.items()}
@@ -1,12 +1,11 @@
 import json
 import os
+import threading
 
 from dotenv import load_dotenv
 from collections import namedtuple
 from pytz import timezone
 
-from schema import ConfigModel
-
 load_dotenv()
 
 REDMINE_LOGIN_URL = os.getenv("REDMINE_LOGIN_URL", "")
@@ -15,8 +14,35 @@ REDMINE_PASSWORD = os.getenv("REDMINE_PASSWORD", "")
 BOT_TOKEN = os.getenv("BOT_TOKEN", "")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")
 REPORT_URL = os.getenv("REPORT_URL", "")
+REDMINE_FETCHER = os.getenv("REDMINE_FETCHER", "http")
+REDMINE_HTTP_TIMEOUT = int(os.getenv("REDMINE_HTTP_TIMEOUT", "30"))
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH", "")
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "1"))
+DRIVER_MAX_USES = int(os.getenv("DRIVER_MAX_USES", "50"))
+DRIVER_MAX_HEAP_MB = int(os.getenv("DRIVER_MAX_HEAP_MB", "512"))
+REDMINE_URL = os.getenv("REDMINE_URL", REDMINE_LOGIN_URL.removesuffix("/login"))
+REDMINE_API_KEY = os.getenv("REDMINE_API_KEY", "")
+REDMINE_API_WORKERS = int(os.getenv("REDMINE_API_WORKERS", "4"))
+TIME_ENTRY_SOURCE = os.getenv("TIME_ENTRY_SOURCE", "html")
+REPORT_DAYS = int(os.getenv("REPORT_DAYS", "7"))
 OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "deepseek-coder")
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "120"))
+OLLAMA_CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "5"))
+OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "2"))
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "10"))
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "512"))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 60 * 60)))
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", "")
+LLM_CACHE_DISK_SIZE = int(os.getenv("LLM_CACHE_DISK_SIZE", "10000"))
+OLLAMA_STREAM = os.getenv("OLLAMA_STREAM", "true").lower() == "true"
+STREAM_EDIT_INTERVAL = float(os.getenv("STREAM_EDIT_INTERVAL", "1.5"))
+REPORT_SNAPSHOT_MAX_AGE = int(os.getenv("REPORT_SNAPSHOT_MAX_AGE", "300"))
+REPORT_FETCH_WORKERS = int(os.getenv("REPORT_FETCH_WORKERS", "2"))
+CHECK_CACHE_SECONDS = int(os.getenv("CHECK_CACHE_SECONDS", "60"))
+CHART_EXECUTOR = os.getenv("CHART_EXECUTOR", "thread")
+CHART_WORKERS = int(os.getenv("CHART_WORKERS", "2"))
+CHART_CACHE_SIZE = int(os.getenv("CHART_CACHE_SIZE", "128"))
 REMINDER_LIMIT: float = 0.75
 WEEKLY_WORK_HOURS: int = 40
 
@@ -25,16 +51,50 @@ SCHEDULE_TIME = TimeConfig(hour=16, minute=45, timezone=timezone("Asia/Yekaterin
 SCHEDULE_TIME_PERSONAL = TimeConfig(
     hour=16, minute=30, timezone=timezone("Asia/Yekaterinburg")
 )
+PRAISE_REFILL_TIME = TimeConfig(
+    hour=3, minute=0, timezone=timezone("Asia/Yekaterinburg")
+)
 SCHEDULE_DAYS = "mon-fri"
 SCHEDULE_MISFIRE_GRACE_TIME = 30
 SCHEDULE_COALESCE = True
-SUBSCRIBERS_FILE = "C:/git/labor_costs_remote/subscribers.json"
+DELIVERY_CONCURRENCY = int(os.getenv("DELIVERY_CONCURRENCY", "8"))
+DELIVERY_MAX_RETRIES = int(os.getenv("DELIVERY_MAX_RETRIES", "3"))
+DELIVERY_MAX_FLOOD_WAITS = int(os.getenv("DELIVERY_MAX_FLOOD_WAITS", "20"))
+TELEGRAM_GLOBAL_RATE: float = 25
+TELEGRAM_CHAT_RATE: float = 1
+SUBSCRIBERS_FILE = os.getenv("SUBSCRIBERS_FILE", "subscribers.json")
+SUBSCRIBERS_DB = os.getenv("SUBSCRIBERS_DB", "subscribers.db")
+PRAISE_POOL_FILE = os.getenv("PRAISE_POOL_FILE", "praise_pool.json")
+PRAISE_POOL_SIZE = int(os.getenv("PRAISE_POOL_SIZE", "20"))
+HOURS_HISTORY_DB = os.getenv("HOURS_HISTORY_DB", "")
+CONVERSATIONS_DB = os.getenv("CONVERSATIONS_DB", "")
+CONVERSATION_MAX_TURNS = int(os.getenv("CONVERSATION_MAX_TURNS", "10"))
+CONVERSATION_MAX_USERS = int(os.getenv("CONVERSATION_MAX_USERS", "1000"))
+CONVERSATION_MAX_BYTES = int(os.getenv("CONVERSATION_MAX_BYTES", str(8 * 1024 * 1024)))
+CONVERSATION_TTL = int(os.getenv("CONVERSATION_TTL", str(24 * 60 * 60)))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
 
 
 config_path = os.getenv("CONFIG_PATH", "config.json")
-with open(config_path, encoding="utf-8") as file:
-    raw_config = json.load(file)
-config = ConfigModel(**raw_config)
-EMPLOYEES = config.employees
+_config_lock = threading.Lock()
 
 LANG = os.getenv("LANG", "eng")
+
+
+def _load_config():
+    from schema import ConfigModel
+
+    with open(config_path, encoding="utf-8") as file:
+        return ConfigModel(**json.load(file))
+
+
+def __getattr__(name: str):
+    # config.json is read and validated on first use of config/EMPLOYEES
+    if name not in ("config", "EMPLOYEES"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _config_lock:
+        if "config" not in globals():
+            loaded = _load_config()
+            globals().update(config=loaded, EMPLOYEES=loaded.all_employees())
+    return globals()[name]
@@ -0,0 +1,179 @@
+import asyncio
+import json
+import sqlite3
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+
+from config import (
+    CONVERSATION_MAX_BYTES,
+    CONVERSATION_MAX_TURNS,
+    CONVERSATION_MAX_USERS,
+    CONVERSATION_TTL,
+    CONVERSATIONS_DB,
+)
+from sqlite_store import SQLiteStore
+
+Turn = dict[str, str]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    user_id INTEGER PRIMARY KEY,
+    turns TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+UPSERT = """
+INSERT INTO conversations (user_id, turns, updated_at) VALUES (?, ?, ?)
+ON CONFLICT (user_id) DO UPDATE SET
+    turns = excluded.turns,
+    updated_at = excluded.updated_at
+"""
+
+
+def _turn_size(turn: Turn) -> int:
+    return len(turn["role"]) + len(turn["content"].encode())
+
+
+@dataclass
+class _Conversation:
+    turns: deque[Turn]
+    size: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+    def append(self, turn: Turn) -> None:
+        if len(self.turns) == self.turns.maxlen:
+            self.size -= _turn_size(self.turns[0])
+        self.turns.append(turn)
+        self.size += _turn_size(turn)
+
+    def drop_oldest(self) -> None:
+        self.size -= _turn_size(self.turns.popleft())
+
+
+class ConversationStore(SQLiteStore):
+    """Per-user chat history with LRU/TTL eviction and a global byte budget.
+
+    With a database path, histories are written through to SQLite and loaded
+    back on a user's first message after a restart or an eviction.
+    """
+
+    schema = SCHEMA
+
+    def __init__(
+        self,
+        path: str | None = CONVERSATIONS_DB or None,
+        max_turns: int = CONVERSATION_MAX_TURNS,
+        max_users: int = CONVERSATION_MAX_USERS,
+        max_bytes: int = CONVERSATION_MAX_BYTES,
+        ttl: float = CONVERSATION_TTL,
+    ):
+        super().__init__(path)
+        self.max_turns = max_turns
+        self.max_users = max_users
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._conversations: OrderedDict[int, _Conversation] = OrderedDict()
+        self._bytes = 0
+
+    def _prepare(self, connection: sqlite3.Connection) -> None:
+        connection.execute(
+            "DELETE FROM conversations WHERE updated_at < ?",
+            (time.time() - self.ttl,),
+        )
+
+    def _load(self, user_id: int) -> _Conversation:
+        conversation = _Conversation(deque(maxlen=self.max_turns))
+        if self.path:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT turns, updated_at FROM conversations WHERE user_id = ?",
+                    (user_id,),
+                )
+                .fetchone()
+            )
+            if row and time.time() - row[1] < self.ttl:
+                for turn in json.loads(row[0]):
+                    conversation.append(turn)
+        return conversation
+
+    def _save(self, user_id: int, conversation: _Conversation) -> None:
+        if self.path:
+            self._connect().execute(
+                UPSERT, (user_id, json.dumps(list(conversation.turns)), time.time())
+            )
+
+    def _get(self, user_id: int) -> _Conversation:
+        now = time.monotonic()
+        conversation = self._conversations.get(user_id)
+        if conversation is None or now - conversation.last_used >= self.ttl:
+            if conversation is not None:
+                self._bytes -= conversation.size
+            conversation = self._load(user_id)
+            self._bytes += conversation.size
+            self._conversations[user_id] = conversation
+        conversation.last_used = now
+        self._conversations.move_to_end(user_id)
+        return conversation
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        while self._conversations:
+            user_id, oldest = next(iter(self._conversations.items()))
+            if (
+                len(self._conversations) <= self.max_users
+                and self._bytes <= self.max_bytes
+                and now - oldest.last_used < self.ttl
+            ):
+                break
+            if len(self._conversations) == 1:
+                # A single history over budget loses its oldest turns instead
+                while self._bytes > self.max_bytes and len(oldest.turns) > 1:
+                    self._bytes -= oldest.size
+                    oldest.drop_oldest()
+                    self._bytes += oldest.size
+                break
+            del self._conversations[user_id]
+            self._bytes -= oldest.size
+
+    def history(self, user_id: int) -> list[Turn]:
+        with self._lock:
+            return list(self._get(user_id).turns)
+
+    def append(self, user_id: int, role: str, content: str) -> list[Turn]:
+        with self._lock:
+            conversation = self._get(user_id)
+            self._bytes -= conversation.size
+            conversation.append({"role": role, "content": content})
+            self._bytes += conversation.size
+            self._save(user_id, conversation)
+            self._evict()
+            return list(conversation.turns)
+
+    def clear(self, user_id: int) -> None:
+        with self._lock:
+            conversation = self._conversations.pop(user_id, None)
+            if conversation is not None:
+                self._bytes -= conversation.size
+            if self.path:
+                self._connect().execute(
+                    "DELETE FROM conversations WHERE user_id = ?", (user_id,)
+                )
+
+    @property
+    def bytes_used(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+    async def history_async(self, user_id: int) -> list[Turn]:
+        return await asyncio.to_thread(self.history, user_id)
+
+    async def append_async(self, user_id: int, role: str, content: str) -> list[Turn]:
+        return await asyncio.to_thread(self.append, user_id, role, content)
+
+
+conversation_store = ConversationStore()
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiogram.exceptions import (
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+
+from config import (
+    DELIVERY_CONCURRENCY,
+    DELIVERY_MAX_FLOOD_WAITS,
+    DELIVERY_MAX_RETRIES,
+    TELEGRAM_CHAT_RATE,
+    TELEGRAM_GLOBAL_RATE,
+)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+@dataclass(frozen=True)
+class Delivery:
+    chat_id: int | str
+    send: Callable[[], Awaitable[Any]]
+
+
+@dataclass
+class DeliveryStats:
+    total: int = 0
+    sent: int = 0
+    failed: int = 0
+    retried: int = 0
+    elapsed: float = 0.0
+    failed_chats: list[int | str] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        return (
+            f"delivered {self.sent}/{self.total}, failed {self.failed}, "
+            f"retries {self.retried}, {self.elapsed:.1f}s"
+        )
+
+
+RETRYABLE_ERRORS = (TelegramNetworkError, TelegramServerError)
+
+
+class DeliveryPipeline:
+    """Bounded worker pool that respects Telegram global and per-chat limits."""
+
+    def __init__(
+        self,
+        concurrency: int = DELIVERY_CONCURRENCY,
+        global_rate: float = TELEGRAM_GLOBAL_RATE,
+        chat_rate: float = TELEGRAM_CHAT_RATE,
+        max_retries: int = DELIVERY_MAX_RETRIES,
+        max_flood_waits: int = DELIVERY_MAX_FLOOD_WAITS,
+    ):
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.max_flood_waits = max_flood_waits
+        self.global_bucket = TokenBucket(global_rate)
+        self.chat_buckets: defaultdict[int | str, TokenBucket] = defaultdict(
+            lambda: TokenBucket(chat_rate, capacity=1)
+        )
+        self._paused_until = 0.0
+
+    async def _wait_for_flood_pause(self) -> None:
+        delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _send(self, delivery: Delivery, stats: DeliveryStats) -> None:
+        # Flood waits are Telegram pacing us, not failures, so they have their
+        # own budget apart from the error retries
+        failures = flood_waits = 0
+        while True:
+            await self._wait_for_flood_pause()
+            await self.chat_buckets[delivery.chat_id].acquire()
+            await self.global_bucket.acquire()
+            try:
+                await delivery.send()
+                stats.sent += 1
+                return
+            except TelegramRetryAfter as error:
+                # Flood wait applies to the whole bot, so every worker pauses
+                self._paused_until = max(
+                    self._paused_until, time.monotonic() + error.retry_after
+                )
+                flood_waits += 1
+                retry = flood_waits <= self.max_flood_waits
+            except RETRYABLE_ERRORS as error:
+                logging.warning(f"Delivery to {delivery.chat_id} failed: {error}")
+                failures += 1
+                retry = failures <= self.max_retries
+                if retry:
+                    await asyncio.sleep(2 ** (failures - 1))
+            except Exception as error:
+                logging.error(f"Error processing user {delivery.chat_id}: {error}")
+                retry = False
+            if not retry:
+                break
+            stats.retried += 1
+        stats.failed += 1
+        stats.failed_chats.append(delivery.chat_id)
+
+    async def _worker(
+        self, queue: asyncio.Queue[Delivery], stats: DeliveryStats
+    ) -> None:
+        while True:
+            delivery = await queue.get()
+            try:
+                await self._send(delivery, stats)
+            finally:
+                queue.task_done()
+
+    async def deliver(self, deliveries: Iterable[Delivery]) -> DeliveryStats:
+        started = time.monotonic()
+        stats = DeliveryStats()
+        queue: asyncio.Queue[Delivery] = asyncio.Queue()
+        for delivery in deliveries:
+            queue.put_nowait(delivery)
+        stats.total = queue.qsize()
+        workers = [
+            asyncio.create_task(self._worker(queue, stats))
+            for _ in range(min(self.concurrency, stats.total))
+        ]
+        try:
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        stats.elapsed = time.monotonic() - started
+        return stats
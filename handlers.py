@@ -1,31 +1,33 @@
-import json
 import logging
-from collections import defaultdict
 
 from aiogram import Dispatcher
 from aiogram.types import Message, ReplyKeyboardMarkup, KeyboardButton
 from aiogram.filters import Command
-from ollama import Client
 
-from config import SUBSCRIBERS_FILE, OLLAMA_HOST, OLLAMA_MODEL
-from redmine import fetch_page_source
-from parser import extract_last_level_rows, format_hours_report
+from config import OLLAMA_MODEL, OLLAMA_STREAM, CHECK_CACHE_SECONDS
+from conversations import conversation_store
+from llm import LLMRequestSuperseded, llm_client
+from metrics import subscriber_count
+from parser import build_hours_report_async
+from snapshot import get_report_snapshot_async
+from streaming import StreamingReply, split_message
+from subscribers import subscriber_store
+from teams import team_for_chat
 from aiogram.types import BufferedInputFile
 
 from translations import t
 
-# Store conversation history for each user
-conversation_history: dict[int, list[dict[str, str]]] = defaultdict(list)
-MAX_HISTORY_LENGTH = 10
-
-ollama_client = Client(host=OLLAMA_HOST)
-
 
 async def manual_check(message: Message):
     try:
-        page_html = fetch_page_source()
-        time_entries_html = extract_last_level_rows(page_html)
-        hours_report = format_hours_report(time_entries_html)
+        username = message.from_user.username if message.from_user else None
+        team = team_for_chat(message.chat.id, username)
+        snapshot = await get_report_snapshot_async(
+            max_age=CHECK_CACHE_SECONDS, team=team
+        )
+        hours_report = await build_hours_report_async(
+            snapshot.work_hours, employees=team.employees
+        )
         if hours_report.image:
             image_file = BufferedInputFile(
                 hours_report.image, filename="work_hours_chart.png"
@@ -40,15 +42,9 @@ async def manual_check(message: Message):
         await message.answer(f"❗ {t('error')}: {error}")
 
 
-def update_subscription(user, subscribe: bool):
-    subscribers_data: dict[str, dict[str, bool | str]] = {}
-    with open(SUBSCRIBERS_FILE, encoding="utf-8") as f:
-        subscribers_data = json.load(f)
-    user_id_str = str(user.id)
-    subscribers_data[user_id_str] = {"subscribe": subscribe, "username": user.username}
-    if subscribers_data:
-        with open(SUBSCRIBERS_FILE, "w", encoding="utf-8") as f:
-            json.dump(subscribers_data, f, ensure_ascii=False, indent=2)
+async def update_subscription(user, subscribe: bool):
+    await subscriber_store.upsert_async(user.id, user.username, subscribe)
+    subscriber_count.set(await subscriber_store.count_async())
 
 
 async def _subscription_command(message: Message, subscribe: bool):
@@ -57,7 +53,7 @@ async def _subscription_command(message: Message, subscribe: bool):
             "📝 Пожалуйста, напишите эту команду в личные сообщения бота @arbeitenx_bot"
         )
         return
-    update_subscription(user=message.from_user, subscribe=subscribe)
+    await update_subscription(user=message.from_user, subscribe=subscribe)
     if subscribe:
         await message.answer(
             "✅ Вы успешно подписались на получение ежедневного отчета по трудовым затратам в личные сообщения!\n"
@@ -109,30 +105,39 @@ async def chat_message(message: Message):
     user_id = message.from_user.id
     user_message = message.text
 
-    conversation_history[user_id].append({"role": "user", "content": user_message})
-
-    if len(conversation_history[user_id]) > MAX_HISTORY_LENGTH:
-        conversation_history[user_id] = conversation_history[user_id][
-            -MAX_HISTORY_LENGTH:
-        ]
-
     try:
-        response = ollama_client.chat(
-            model=OLLAMA_MODEL,
-            messages=conversation_history[user_id],
-        )
+        messages = await conversation_store.append_async(user_id, "user", user_message)
+        # A newer message from the same user cancels this request
+        if OLLAMA_STREAM:
+            reply = StreamingReply(message)
+            ai_message = await llm_client.chat_stream(
+                model=OLLAMA_MODEL,
+                messages=messages,
+                on_text=reply.update,
+                key=user_id,
+            )
+        else:
+            ai_message = await llm_client.chat(
+                model=OLLAMA_MODEL, messages=messages, key=user_id
+            )
 
-        ai_message = response["message"]["content"]
+        await conversation_store.append_async(user_id, "assistant", ai_message)
 
-        conversation_history[user_id].append(
-            {"role": "assistant", "content": ai_message}
-        )
-
-        await message.answer(ai_message)
+        if OLLAMA_STREAM:
+            await reply.finish(ai_message)
+        else:
+            for part in split_message(ai_message):
+                await message.answer(part)
 
+    except LLMRequestSuperseded:
+        return
     except Exception as e:
         error_msg = str(e)
-        if "connection" in error_msg.lower() or "timeout" in error_msg.lower():
+        if (
+            isinstance(e, (TimeoutError, ConnectionError))
+            or "connection" in error_msg.lower()
+            or "timeout" in error_msg.lower()
+        ):
             logging.error(f"Ollama service unavailable for user {user_id}: {e}")
             await message.answer(
                 "❗ Сервис AI временно недоступен. Попробуйте позже или обратитесь к администратору."
@@ -0,0 +1,136 @@
+from collections.abc import Iterable
+from datetime import date, timedelta
+
+import numpy as np
+
+from config import HOURS_HISTORY_DB
+from hours_matrix import HoursMatrix
+from sqlite_store import SQLiteStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hours (
+    day TEXT NOT NULL,
+    employee TEXT NOT NULL,
+    hours REAL NOT NULL,
+    PRIMARY KEY (day, employee)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS hours_employee_day ON hours (employee, day);
+"""
+
+UPSERT = """
+INSERT INTO hours (day, employee, hours) VALUES (?, ?, ?)
+ON CONFLICT (day, employee) DO UPDATE SET hours = excluded.hours
+"""
+
+
+def _window(end: date, days_count: int) -> list[date]:
+    return [
+        end - timedelta(days=days_count - 1 - offset) for offset in range(days_count)
+    ]
+
+
+class HoursHistory(SQLiteStore):
+    """Daily hours per employee, one row per (day, employee) with non-zero hours.
+
+    Each recorded report window only writes the cells that changed since the
+    previous run, so multi-week questions are answered from SQLite.
+    """
+
+    schema = SCHEMA
+
+    def __init__(self, path: str | None = HOURS_HISTORY_DB or None):
+        super().__init__(path)
+
+    def record(
+        self,
+        work_hours: HoursMatrix,
+        end: date,
+        employees: Iterable[str] | None = None,
+    ) -> int:
+        """Stores a report window ending on ``end`` and returns the changed cells.
+
+        With ``employees`` only their rows are replaced, so reports covering
+        different teams don't delete each other's hours.
+        """
+        if not self.path or not work_hours or not work_hours.days_count:
+            return 0
+        days = [day.isoformat() for day in _window(end, work_hours.days_count)]
+        with self._lock:
+            connection = self._connect()
+            scope = set(employees) if employees is not None else None
+            stored = {
+                (day, employee): hours
+                for day, employee, hours in connection.execute(
+                    "SELECT day, employee, hours FROM hours WHERE day BETWEEN ? AND ?",
+                    (days[0], days[-1]),
+                )
+                if scope is None or employee in scope
+            }
+            rows, columns = np.nonzero(work_hours.days)
+            current = {
+                (days[column], work_hours.names[row]): float(
+                    work_hours.days[row, column]
+                )
+                for row, column in zip(rows, columns)
+            }
+            changed = [
+                (day, employee, hours)
+                for (day, employee), hours in current.items()
+                if stored.get((day, employee)) != hours
+            ]
+            # Entries deleted in Redmine since the last run
+            removed = [key for key in stored if key not in current]
+            if changed or removed:
+                with connection:
+                    connection.execute("BEGIN")
+                    connection.executemany(UPSERT, changed)
+                    connection.executemany(
+                        "DELETE FROM hours WHERE day = ? AND employee = ?", removed
+                    )
+            return len(changed) + len(removed)
+
+    def hours(
+        self, start: date, end: date, employees: list[str] | None = None
+    ) -> HoursMatrix:
+        """Employees x days matrix for ``start``..``end`` with per-row totals."""
+        days = [day.isoformat() for day in _window(end, (end - start).days + 1)]
+        query = "SELECT day, employee, hours FROM hours WHERE day BETWEEN ? AND ?"
+        parameters: list[str] = [days[0], days[-1]]
+        if employees is not None:
+            query += f" AND employee IN ({', '.join('?' * len(employees))})"
+            parameters += employees
+        with self._lock:
+            rows = (
+                self._connect().execute(query, parameters).fetchall()
+                if self.path
+                else []
+            )
+        names = (
+            list(employees)
+            if employees is not None
+            else sorted({employee for _, employee, _ in rows})
+        )
+        row_of = {name: row for row, name in enumerate(names)}
+        column_of = {day: column for column, day in enumerate(days)}
+        matrix = np.zeros((len(names), len(days)), dtype=np.float64)
+        for day, employee, hours in rows:
+            matrix[row_of[employee], column_of[day]] = hours
+        return HoursMatrix(tuple(names), matrix, matrix.sum(axis=1))
+
+    def weekly_totals(
+        self, start: date, end: date, employees: list[str] | None = None
+    ) -> tuple[list[date], HoursMatrix]:
+        """Hours per ISO week (Monday starts) overlapping ``start``..``end``."""
+        daily = self.hours(start, end, employees)
+        first_monday = start - timedelta(days=start.weekday())
+        week_starts = _window(end, (end - first_monday).days + 1)[::7]
+        offsets = [max((week - start).days, 0) for week in week_starts]
+        weeks = (
+            np.add.reduceat(daily.days, offsets, axis=1)
+            if daily.days.size
+            else np.zeros((len(daily), len(week_starts)))
+        )
+        return week_starts, HoursMatrix(daily.names, weeks, daily.totals)
+
+
+hours_history = HoursHistory()
@@ -0,0 +1,100 @@
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+
+
+def _to_float(value: str) -> float:
+    try:
+        return float(value.replace(",", "."))
+    except ValueError:
+        return 0.0
+
+
+def format_hours(hours: float) -> str:
+    return f"{round(float(hours), 2):g}"
+
+
+@dataclass(frozen=True, eq=False)
+class HoursMatrix:
+    """Employees x days hours table with the report's total column kept aside."""
+
+    names: tuple[str, ...]
+    days: np.ndarray
+    totals: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple[str, Sequence[float]]]) -> "HoursMatrix":
+        names: list[str] = []
+        values: list[Sequence[float]] = []
+        for name, hours in rows:
+            names.append(name)
+            values.append(hours)
+        # The last value of every row is the total, the rest are days
+        width = max((len(hours) - 1 for hours in values), default=0)
+        days = np.zeros((len(values), max(width, 0)), dtype=np.float64)
+        totals = np.zeros(len(values), dtype=np.float64)
+        for row, hours in enumerate(values):
+            if len(hours):
+                days[row, : len(hours) - 1] = hours[:-1]
+                totals[row] = hours[-1]
+        return cls(tuple(names), days, totals)
+
+    @classmethod
+    def coerce(
+        cls, work_hours: "HoursMatrix | Mapping[str, Sequence[str]]"
+    ) -> "HoursMatrix":
+        if isinstance(work_hours, HoursMatrix):
+            return work_hours
+        return cls.from_rows(
+            (name, [_to_float(value) for value in hours])
+            for name, hours in work_hours.items()
+        )
+
+    @cached_property
+    def index(self) -> dict[str, int]:
+        return {name: row for row, name in enumerate(self.names)}
+
+    @property
+    def days_count(self) -> int:
+        return self.days.shape[1]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.index
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, HoursMatrix):
+            return NotImplemented
+        return (
+            self.names == other.names
+            and np.array_equal(self.days, other.days)
+            and np.array_equal(self.totals, other.totals)
+        )
+
+    def employee(self, name: str) -> "HoursMatrix | None":
+        row = self.index.get(name)
+        if row is None:
+            return None
+        return HoursMatrix(
+            (name,), self.days[row : row + 1], self.totals[row : row + 1]
+        )
+
+    def select(self, names: Iterable[str]) -> "HoursMatrix":
+        rows = [self.index[name] for name in names if name in self.index]
+        return HoursMatrix(
+            tuple(self.names[row] for row in rows), self.days[rows], self.totals[rows]
+        )
+
+    def to_strings(self) -> dict[str, list[str]]:
+        return {
+            name: [format_hours(hours) for hours in self.days[row]]
+            + [format_hours(self.totals[row])]
+            for row, name in enumerate(self.names)
+        }
@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Hashable, Mapping, Sequence
+from typing import TYPE_CHECKING, Any
+
+from config import (
+    OLLAMA_CONNECT_TIMEOUT,
+    OLLAMA_HOST,
+    OLLAMA_MAX_CONCURRENCY,
+    OLLAMA_MAX_CONNECTIONS,
+    OLLAMA_TIMEOUT,
+)
+from llm_cache import LLMCache, cache_key, llm_cache
+
+if TYPE_CHECKING:
+    from ollama import AsyncClient
+
+
+class LLMRequestSuperseded(Exception):
+    """Raised to the caller whose request was cancelled by a newer one."""
+
+
+class LLMClient:
+    """Shared async Ollama client with per-model limits and per-key cancellation."""
+
+    def __init__(
+        self,
+        host: str = OLLAMA_HOST,
+        timeout: float = OLLAMA_TIMEOUT,
+        connect_timeout: float = OLLAMA_CONNECT_TIMEOUT,
+        max_concurrency: int = OLLAMA_MAX_CONCURRENCY,
+        max_connections: int = OLLAMA_MAX_CONNECTIONS,
+        cache: LLMCache | None = llm_cache,
+    ):
+        self.host = host
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.cache = cache
+        self._client: "AsyncClient | None" = None
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+    @property
+    def client(self) -> "AsyncClient":
+        if self._client is None:
+            # ollama and httpx load on the first request, not at bot startup
+            import httpx
+            from ollama import AsyncClient
+
+            self._client = AsyncClient(
+                host=self.host,
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    def _semaphore(self, model: str) -> asyncio.Semaphore:
+        if model not in self._semaphores:
+            self._semaphores[model] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[model]
+
+    async def _limited(self, model: str, call) -> Any:
+        async with self._semaphore(model), asyncio.timeout(self.timeout):
+            return await call()
+
+    async def _run(self, model: str, call, key: Hashable | None) -> Any:
+        if key is None:
+            return await self._limited(model, call)
+        previous = self._inflight.get(key)
+        if previous is not None and not previous.done():
+            previous.cancel()
+        task = asyncio.ensure_future(self._limited(model, call))
+        self._inflight[key] = task
+        try:
+            return await task
+        except asyncio.CancelledError:
+            current = asyncio.current_task()
+            if task.cancelled() and not (current and current.cancelling()):
+                raise LLMRequestSuperseded(key) from None
+            task.cancel()
+            raise
+        finally:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+
+    async def _cached(self, cache_id: str | None, key: Hashable | None) -> str | None:
+        if cache_id is None or self.cache is None:
+            return None
+        response = await self.cache.get_async(cache_id)
+        if response is not None and key is not None:
+            # A cached answer still supersedes the user's pending request
+            self.cancel(key)
+        return response
+
+    async def _store(self, cache_id: str | None, response: str) -> None:
+        if cache_id is not None and self.cache is not None and response:
+            await self.cache.put_async(cache_id, response)
+
+    async def chat(
+        self,
+        model: str,
+        messages: Sequence[Mapping[str, Any]],
+        key: Hashable | None = None,
+        use_cache: bool = True,
+    ) -> str:
+        cache_id = cache_key(model, None, messages) if use_cache else None
+        cached = await self._cached(cache_id, key)
+        if cached is not None:
+            return cached
+        response = await self._run(
+            model, lambda: self.client.chat(model=model, messages=messages), key
+        )
+        content = response["message"]["content"]
+        await self._store(cache_id, content)
+        return content
+
+    async def chat_stream(
+        self,
+        model: str,
+        messages: Sequence[Mapping[str, Any]],
+        on_text: Callable[[str], Awaitable[None]],
+        key: Hashable | None = None,
+        use_cache: bool = True,
+    ) -> str:
+        """Streams a chat completion, passing the text so far to ``on_text``."""
+        cache_id = cache_key(model, None, messages) if use_cache else None
+        cached = await self._cached(cache_id, key)
+        if cached is not None:
+            await on_text(cached)
+            return cached
+
+        async def consume() -> str:
+            started = time.perf_counter()
+            text = ""
+            stream = await self.client.chat(model=model, messages=messages, stream=True)
+            async for chunk in stream:
+                content = chunk["message"]["content"]
+                if not content:
+                    continue
+                if not text:
+                    logging.info(
+                        f"Ollama {model} first token after "
+                        f"{time.perf_counter() - started:.2f}s"
+                    )
+                text += content
+                await on_text(text)
+            return text
+
+        text = await self._run(model, consume, key)
+        await self._store(cache_id, text)
+        return text
+
+    async def generate(
+        self,
+        model: str,
+        prompt: str,
+        system: str | None = None,
+        key: Hashable | None = None,
+        use_cache: bool = True,
+    ) -> str:
+        cache_id = (
+            cache_key(model, system, [{"role": "user", "content": prompt}])
+            if use_cache
+            else None
+        )
+        cached = await self._cached(cache_id, key)
+        if cached is not None:
+            return cached
+        response = await self._run(
+            model,
+            lambda: self.client.generate(
+                model=model,
+                prompt=prompt,
+                system=system,  # type: ignore[arg-type]
+            ),
+            key,
+        )
+        await self._store(cache_id, response["response"])
+        return response["response"]
+
+    def cancel(self, key: Hashable) -> bool:
+        task = self._inflight.get(key)
+        return task is not None and task.cancel()
+
+    async def close(self) -> None:
+        for task in self._inflight.values():
+            task.cancel()
+        self._inflight.clear()
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+llm_client = LLMClient()
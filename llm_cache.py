@@ -0,0 +1,150 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+from config import LLM_CACHE_DB, LLM_CACHE_DISK_SIZE, LLM_CACHE_SIZE, LLM_CACHE_TTL
+from sqlite_store import SQLiteStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS llm_cache_expires_at ON llm_cache (expires_at);
+"""
+
+UPSERT = """
+INSERT INTO llm_cache (key, response, expires_at) VALUES (?, ?, ?)
+ON CONFLICT (key) DO UPDATE SET
+    response = excluded.response,
+    expires_at = excluded.expires_at
+"""
+
+LOG_EVERY = 100
+
+
+def _normalize(text: str | None) -> str:
+    return " ".join((text or "").split()).casefold()
+
+
+def cache_key(
+    model: str, system: str | None, messages: Sequence[Mapping[str, Any]]
+) -> str:
+    payload = [
+        model,
+        _normalize(system),
+        [(message["role"], _normalize(message["content"])) for message in messages],
+    ]
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode()).hexdigest()
+
+
+class LLMCache(SQLiteStore):
+    """Memory LRU of model answers with a TTL and an optional SQLite tier."""
+
+    schema = SCHEMA
+
+    def __init__(
+        self,
+        max_entries: int = LLM_CACHE_SIZE,
+        ttl: float = LLM_CACHE_TTL,
+        path: str | None = LLM_CACHE_DB or None,
+        max_disk_entries: int = LLM_CACHE_DISK_SIZE,
+    ):
+        super().__init__(path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _prepare(self, connection: sqlite3.Connection) -> None:
+        connection.execute("DELETE FROM llm_cache WHERE expires_at < ?", (time.time(),))
+
+    def _remember(self, key: str, expires_at: float, response: str) -> None:
+        self._memory[key] = (expires_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, key: str) -> str | None:
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self._memory.move_to_end(key)
+                return entry[1]
+            del self._memory[key]
+        if self.path:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT expires_at, response FROM llm_cache"
+                    " WHERE key = ? AND expires_at > ?",
+                    (key, now),
+                )
+                .fetchone()
+            )
+            if row:
+                self._remember(key, row[0], row[1])
+                return row[1]
+        return None
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            response = self._lookup(key)
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            if (self.hits + self.misses) % LOG_EVERY == 0:
+                logging.info(
+                    f"LLM cache hit rate {self.hit_rate:.0%} "
+                    f"({self.hits}/{self.hits + self.misses})"
+                )
+            return response
+
+    def put(self, key: str, response: str) -> None:
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, response)
+            if self.path:
+                connection = self._connect()
+                connection.execute(UPSERT, (key, response, expires_at))
+                connection.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache"
+                    " ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_disk_entries,),
+                )
+
+    async def get_async(self, key: str) -> str | None:
+        if not self.path:
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def put_async(self, key: str, response: str) -> None:
+        if not self.path:
+            self.put(key, response)
+        else:
+            await asyncio.to_thread(self.put, key, response)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self.path:
+                self._connect().execute("DELETE FROM llm_cache")
+
+
+llm_cache = LLMCache()
@@ -0,0 +1,99 @@
+import logging
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+from config import METRICS_HOST, METRICS_PORT
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+STAGE_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+stage_seconds = Histogram(
+    "labor_costs_stage_seconds",
+    "Time spent in each report pipeline stage (fetch, parse, render, send).",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+fetch_phase_seconds = Histogram(
+    "labor_costs_fetch_phase_seconds",
+    "Redmine fetch phases (driver_start, login, report_load) per backend.",
+    ["backend", "phase"],
+    buckets=STAGE_BUCKETS,
+)
+fetch_page_bytes = Histogram(
+    "labor_costs_fetch_page_bytes",
+    "Size of the downloaded Redmine report page.",
+    ["backend"],
+    buckets=(1e4, 5e4, 1e5, 5e5, 1e6, 5e6, 1e7, 5e7),
+)
+redmine_failures = Counter(
+    "labor_costs_redmine_failures",
+    "Report fetches from Redmine that failed.",
+    ["source"],
+)
+redmine_fallbacks = Counter(
+    "labor_costs_redmine_fallbacks",
+    "HTTP report fetches that fell back to Selenium.",
+)
+telegram_errors = Counter(
+    "labor_costs_telegram_errors",
+    "Telegram API errors while sending reports.",
+    ["error"],
+)
+ollama_fallbacks = Counter(
+    "labor_costs_ollama_fallbacks",
+    "Team praise taken from the built-in phrases instead of the Ollama pool.",
+)
+subscriber_count = Gauge(
+    "labor_costs_subscribers",
+    "Users subscribed to personal reports.",
+)
+inflight_fetches = Gauge(
+    "labor_costs_inflight_fetches",
+    "Redmine report fetches currently running.",
+)
+
+
+async def start_metrics_server(
+    health: Callable[[], bool],
+    host: str = METRICS_HOST,
+    port: int = METRICS_PORT,
+    registry: CollectorRegistry = REGISTRY,
+) -> "web.AppRunner | None":
+    """Serves /metrics and /healthz; returns None when METRICS_PORT is 0."""
+    if not port:
+        return None
+    from aiohttp import web
+
+    async def metrics_handler(request: web.Request) -> web.Response:
+        return web.Response(
+            body=generate_latest(registry),
+            headers={"Content-Type": CONTENT_TYPE_LATEST},
+        )
+
+    async def health_handler(request: web.Request) -> web.Response:
+        # Answering at all shows the event loop is alive
+        healthy = health()
+        return web.Response(
+            text="ok" if healthy else "unhealthy", status=200 if healthy else 503
+        )
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics_handler)
+    app.router.add_get("/healthz", health_handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logging.info(f"Metrics served on http://{host}:{port}/metrics")
+    return runner
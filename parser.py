@@ -1,15 +1,30 @@
 import random
-import io
 from dataclasses import dataclass
+from html.parser import HTMLParser
+from itertools import accumulate
 
+from collections.abc import Hashable, Mapping
+from typing import TypeVar
+
+from charts import (
+    ChartData,
+    render_chart_async,
+    render_chart_cached,
+    render_charts_batch_async,
+)
+from hours_matrix import HoursMatrix, format_hours
+from metrics import stage_seconds
 from schema import EmployeeData
+from work_calendar import WorkCalendar, report_calendar
 from translations import t
-from datetime import datetime, timedelta
+from datetime import datetime
+
+import numpy as np
 
-import matplotlib.pyplot as plt
-from bs4 import BeautifulSoup, Tag
+import config
+from config import WEEKLY_WORK_HOURS, REMINDER_LIMIT
 
-from config import EMPLOYEES, WEEKLY_WORK_HOURS, REMINDER_LIMIT
+K = TypeVar("K", bound=Hashable)
 
 
 @dataclass
@@ -19,199 +34,334 @@ class HoursReport:
     has_missing: bool
 
 
+@dataclass(frozen=True)
+class ReportRow:
+    name: str
+    hours: tuple[float, ...]
+    span: tuple[int, int]
+
+
+def _parse_hours(int_part: str, dec_part: str) -> float:
+    try:
+        hours = float(int_part or 0)
+    except ValueError:
+        return 0.0
+    dec_part = dec_part.strip()
+    if dec_part.startswith(":") and dec_part[1:].isdigit():
+        return hours + int(dec_part[1:]) / 60
+    if dec_part[:1] in ".," and dec_part[1:].isdigit():
+        return hours + float("0." + dec_part[1:])
+    return hours
+
+
+class _ReportRowParser(HTMLParser):
+    """Collects ``tr.last-level`` rows of a Redmine report in a single pass."""
+
+    def __init__(self, html: str):
+        super().__init__()
+        self.html = html
+        self.line_offsets = [0, *accumulate(len(line) + 1 for line in html.split("\n"))]
+        self.rows: list[ReportRow] = []
+        self._row_start: int | None = None
+        self._row_name = ""
+        self._hours: list[float] = []
+        self._name_text: list[str] | None = None
+        self._cell: dict[str, str] | None = None
+        self._span_kind: str | None = None
+        self._span_text: list[str] = []
+
+    def _offset(self) -> int:
+        line, column = self.getpos()
+        return self.line_offsets[line - 1] + column
+
+    def handle_starttag(self, tag, attrs):
+        classes = (dict(attrs).get("class") or "").split()
+        if tag == "tr":
+            self._finish_row(self._offset())
+            if "last-level" in classes:
+                self._row_start = self._offset()
+        elif self._row_start is None:
+            return
+        elif tag == "td" and "name" in classes:
+            self._name_text = []
+        elif tag == "td" and "hours" in classes:
+            self._finish_cell()
+            self._cell = {"hours-int": "", "hours-dec": ""}
+        elif tag == "span" and self._cell is not None:
+            self._span_kind = next((c for c in classes if c in self._cell), None)
+            self._span_text = []
+
+    def handle_data(self, data):
+        if self._span_kind is not None:
+            self._span_text.append(data.strip())
+        if self._name_text is not None:
+            self._name_text.append(data.strip())
+
+    def handle_endtag(self, tag):
+        if self._row_start is None:
+            return
+        if tag == "span":
+            self._finish_span()
+        elif tag == "td":
+            if self._name_text is not None:
+                self._row_name = " ".join("".join(self._name_text).split())
+                self._name_text = None
+            self._finish_cell()
+        elif tag == "tr":
+            self._finish_row(self.html.find(">", self._offset()) + 1)
+        elif tag in ("table", "tbody"):
+            self._finish_row(self._offset())
+
+    def _finish_span(self):
+        if self._span_kind is not None and self._cell is not None:
+            self._cell[self._span_kind] = "".join(self._span_text)
+        self._span_kind = None
+
+    def _finish_cell(self):
+        self._finish_span()
+        if self._cell is not None:
+            self._hours.append(
+                _parse_hours(self._cell["hours-int"], self._cell["hours-dec"])
+            )
+            self._cell = None
+
+    def _finish_row(self, end: int):
+        if self._row_start is None:
+            return
+        self._finish_cell()
+        if self._row_name:
+            self.rows.append(
+                ReportRow(self._row_name, tuple(self._hours), (self._row_start, end))
+            )
+        self._row_start = None
+        self._row_name = ""
+        self._hours = []
+        self._name_text = None
+
+    def close(self):
+        super().close()
+        self._finish_row(len(self.html))
+
+
+def parse_report(html_content: str) -> list[ReportRow]:
+    parser = _ReportRowParser(html_content)
+    parser.feed(html_content)
+    parser.close()
+    return parser.rows
+
+
 def extract_last_level_rows(html_content: str) -> str:
-    soup = BeautifulSoup(html_content, "html.parser")
-    time_entry_rows = soup.find_all("tr", class_="last-level")
+    rows = parse_report(html_content)
     return (
-        "\n".join(str(row) for row in time_entry_rows)
-        if time_entry_rows
+        "\n".join(html_content[row.span[0] : row.span[1]] for row in rows)
+        if rows
         else t("no_data")
     )
 
 
-def get_employee_data(name: str) -> EmployeeData | None:
-    employee = EMPLOYEES.get(name)
+Employees = Mapping[str, EmployeeData]
+
+
+def _employees(employees: Employees | None) -> Employees:
+    return config.EMPLOYEES if employees is None else employees
+
+
+def get_employee_data(
+    name: str, employees: Employees | None = None
+) -> EmployeeData | None:
+    employee = _employees(employees).get(name)
     if isinstance(employee, EmployeeData):
         return employee
     return None
 
 
-def _adjust_rate_for_vacation(employee_name: str, report_days_count: int) -> float:
-    employee = get_employee_data(employee_name)
-    if not employee:
-        return 1.0
-    rate = employee.rate
-    vacation_range = employee.vacation_range
-    if not vacation_range or len(vacation_range) != 2:
-        return rate
-    start, end = vacation_range
-    report_end = datetime.today().date()
-    report_start = report_end - timedelta(days=report_days_count - 1)
-    overlap_start = max(report_start, start)
-    overlap_end = min(report_end, end)
-
-    if overlap_start > overlap_end:
-        vacation_workdays = 0
-    else:
-        vacation_workdays = sum(
-            1
-            for i in range((overlap_end - overlap_start).days + 1)
-            if (overlap_start + timedelta(days=i)).weekday() < 5
-        )
+def _report_calendar(report_days_count: int) -> WorkCalendar:
+    return report_calendar(report_days_count, datetime.today().date())
 
-    total_workdays = sum(
-        1
-        for i in range((report_end - report_start).days + 1)
-        if (report_start + timedelta(days=i)).weekday() < 5
-    )
 
-    effective_workdays = max(1, total_workdays - vacation_workdays)
-    return rate * (effective_workdays / total_workdays)
+def _adjust_rate_for_vacation(employee_name: str, report_days_count: int) -> float:
+    calendar = _report_calendar(report_days_count)
+    return float(calendar.effective_rates([get_employee_data(employee_name)])[0])
 
 
 def _is_employee_on_full_vacation(employee_name: str, report_days_count: int) -> bool:
-    employee = get_employee_data(employee_name)
-    if not employee or not employee.vacation_range or len(employee.vacation_range) != 2:
-        return False
-    start_vacation, end_vacation = employee.vacation_range
-    today = datetime.today().date()
-    return all(
-        start_vacation <= today - timedelta(days=i) <= end_vacation
-        for i in range(report_days_count)
+    calendar = _report_calendar(report_days_count)
+    return bool(calendar.on_full_vacation([get_employee_data(employee_name)])[0])
+
+
+def parse_time_entries(
+    time_entries_html: str, employees: Employees | None = None
+) -> dict[str, list[str]]:
+    employees = _employees(employees)
+    return {
+        row.name: [str(int(hours)) for hours in row.hours]
+        for row in parse_report(time_entries_html)
+        if row.name in employees
+    }
+
+
+def parse_hours_matrix(
+    html_content: str, employees: Employees | None = None
+) -> HoursMatrix:
+    employees = _employees(employees)
+    return HoursMatrix.from_rows(
+        (row.name, row.hours)
+        for row in parse_report(html_content)
+        if row.name in employees
     )
 
 
-def parse_time_entries(time_entries_html: str) -> dict[str, list[str]]:
-    soup: BeautifulSoup = BeautifulSoup(time_entries_html, "html.parser")
-    rows = soup.find_all("tr", class_="last-level")
-    work_hours: dict[str, list[str]] = {}
-    for row in rows:
-        if not isinstance(row, Tag):
-            continue
-        employee_name_td = row.find("td", class_="name")
-        if not isinstance(employee_name_td, Tag):
-            continue
-        employee_name = " ".join(employee_name_td.get_text(strip=True).split())
-        hours: list[str] = []
-        hour_cells = row.find_all("td", class_="hours")
-        for cell in hour_cells:
-            if not isinstance(cell, Tag):
-                continue
-            hour_span = cell.find("span", class_="hours-int")
-            hours.append(hour_span.get_text(strip=True) if hour_span else "0")
-        if employee_name in EMPLOYEES:
-            work_hours[employee_name] = hours
-    return work_hours
-
-
-def _generate_report(work_hours: dict[str, list[str]], report_days_count: int) -> str:
+def _generate_report(
+    work_hours: HoursMatrix | dict[str, list[str]], report_days_count: int
+) -> str:
+    work_hours = HoursMatrix.coerce(work_hours)
     report_message: str = ""
-    short_names = [name.split()[0] for name in work_hours.keys()]
+    short_names = [name.split()[0] for name in work_hours.names]
     max_name_length: int = max(len(name) for name in short_names)
-    for name, hours in work_hours.items():
-        formatted_hours: str = "|".join(hours[:-1])
-        total: str = hours[-1]
+    for name, days, total_hours in zip(
+        work_hours.names, work_hours.days, work_hours.totals
+    ):
+        formatted_hours: str = "|".join(format_hours(hours) for hours in days)
+        total: str = format_hours(total_hours)
         name_padded: str = f"{name.split()[0]:<{max_name_length}}"
         report_message += f"👤 {name_padded}|{formatted_hours} ➡️{total}\n"
     return f"<pre>{report_message}</pre>"
 
 
 def _find_underworked_employees(
-    work_hours: dict[str, list[str]], report_days_count: int
+    work_hours: HoursMatrix | dict[str, list[str]],
+    report_days_count: int,
+    employees: Employees | None = None,
 ) -> list[str]:
-    missing_entries: list[str] = []
+    work_hours = HoursMatrix.coerce(work_hours)
+    employees = _employees(employees)
     variation = random.uniform(0.95, 1.05)  # nosec B311
-    for employee_name, hours in work_hours.items():
-        total_hours = int(hours[-1]) if hours and hours[-1].isdigit() else 0
-        adjusted_rate = _adjust_rate_for_vacation(employee_name, report_days_count)
-        required_hours = (
-            WEEKLY_WORK_HOURS * REMINDER_LIMIT * adjusted_rate
-        ) * variation
-        if total_hours < required_hours:
-            missing_entries.append(str(EMPLOYEES[employee_name].tg))
+    calendar = _report_calendar(report_days_count)
+    adjusted_rates = calendar.effective_rates(
+        [get_employee_data(name, employees) for name in work_hours]
+    )
+    required_hours = WEEKLY_WORK_HOURS * REMINDER_LIMIT * adjusted_rates * variation
+    underworked = np.flatnonzero(work_hours.totals < required_hours)
+    missing_entries: list[str] = [
+        str(employees[work_hours.names[row]].tg) for row in underworked
+    ]
+    absent_names = [name for name in employees if name not in work_hours]
+    on_vacation = calendar.on_full_vacation(
+        [get_employee_data(name, employees) for name in absent_names]
+    )
     absent_employees = [
-        name
-        for name in EMPLOYEES
-        if name not in work_hours
-        and not _is_employee_on_full_vacation(name, report_days_count)
+        name for name, away in zip(absent_names, on_vacation) if not away
     ]
     missing_entries.extend(absent_employees)
     return missing_entries
 
 
-def _generate_hours_chart(work_hours: dict[str, list[str]]) -> bytes:
-    short_names = [name.split()[0] for name in work_hours.keys()]
-    hours = [
-        int(hours[-1]) if hours and hours[-1].isdigit() else 0
-        for hours in work_hours.values()
-    ]
+def _chart_data(
+    work_hours: HoursMatrix, employees: Employees | None = None
+) -> ChartData:
+    rows = [get_employee_data(name, employees) for name in work_hours.names]
+    adjusted_rates = _report_calendar(work_hours.days_count).effective_rates(rows)
     colors = []
-    for name in work_hours.keys():
-        employee = get_employee_data(name)
+    for employee, adjusted_rate in zip(rows, adjusted_rates):
         rate = employee.rate if employee is not None else 1.0
-        adjusted_rate = _adjust_rate_for_vacation(name, len(hours) if hours else 0)
         if rate < 1:
             colors.append("mediumpurple")
         elif adjusted_rate < 1:
             colors.append("hotpink")
         else:
             colors.append("skyblue")
-    plt.figure(figsize=(5, 3))
-    bars = plt.bar(short_names, hours, color=colors, width=0.6)
-    plt.axhline(
-        y=WEEKLY_WORK_HOURS, color="skyblue", linestyle="--", label=t("weekly_norm")
-    )
-    plt.axhline(
-        y=WEEKLY_WORK_HOURS / 2,
-        color="mediumpurple",
-        linestyle="--",
-        label=t("half_norm"),
+    return ChartData(
+        names=tuple(name.split()[0] for name in work_hours.names),
+        hours=tuple(float(hours) for hours in work_hours.totals),
+        labels=tuple(format_hours(hours) for hours in work_hours.totals),
+        colors=tuple(colors),
+        norm=WEEKLY_WORK_HOURS,
+        legend=(t("weekly_norm"), t("half_norm"), t("non_working_days")),
     )
-    plt.plot(
-        [],
-        [],
-        color="hotpink",
-        marker="s",
-        linestyle="None",
-        markersize=8,
-        label=t("non_working_days"),
-    )
-    plt.xticks(rotation=30, ha="right", fontsize=9)
-    plt.yticks(fontsize=9)
-    plt.legend(fontsize=9, loc="lower right", framealpha=0.3)
-    for bar, hour in zip(bars, hours):
-        plt.text(
-            bar.get_x() + bar.get_width() / 2,
-            bar.get_height() + 0.5,
-            str(hour),
-            ha="center",
-            va="bottom",
-            fontsize=9,
-        )
-    buf = io.BytesIO()
-    plt.tight_layout(pad=1)
-    plt.savefig(buf, format="png", dpi=100)
-    buf.seek(0)
-    plt.close()
-    return buf.getvalue()
 
 
-def format_hours_report(time_entries_html: str) -> HoursReport:
-    work_hours = parse_time_entries(time_entries_html)
-    report_days_count = len(work_hours)
-    if not work_hours:
-        return HoursReport(t("no_data"), None, False)
+def _generate_hours_chart(
+    work_hours: HoursMatrix | dict[str, list[str]],
+    employees: Employees | None = None,
+) -> bytes:
+    return render_chart_cached(_chart_data(HoursMatrix.coerce(work_hours), employees))
 
+
+def _prepare_hours_report(
+    work_hours: HoursMatrix, employees: Employees | None = None
+) -> HoursReport:
+    report_days_count = work_hours.days_count
     report_message = _generate_report(work_hours, report_days_count)
-    missing_entries = _find_underworked_employees(work_hours, report_days_count)
+    missing_entries = _find_underworked_employees(
+        work_hours, report_days_count, employees
+    )
     status = (
         "⏳ " + t("fill_hours") + ": " + ", ".join(missing_entries)
         if missing_entries
         else "✅ " + t("all_filled")
     )
-    chart_image = _generate_hours_chart(work_hours)
     return HoursReport(
         text=(report_message + status),
-        image=chart_image,
+        image=None,
         has_missing=bool(missing_entries),
     )
+
+
+def format_hours_report(
+    time_entries_html: str, employees: Employees | None = None
+) -> HoursReport:
+    return build_hours_report(
+        parse_hours_matrix(time_entries_html, employees), employees
+    )
+
+
+def build_hours_report(
+    work_hours: HoursMatrix | dict[str, list[str]],
+    employees: Employees | None = None,
+) -> HoursReport:
+    work_hours = HoursMatrix.coerce(work_hours)
+    if not work_hours:
+        return HoursReport(t("no_data"), None, False)
+    hours_report = _prepare_hours_report(work_hours, employees)
+    with stage_seconds.labels(stage="render").time():
+        hours_report.image = _generate_hours_chart(work_hours, employees)
+    return hours_report
+
+
+async def build_hours_report_async(
+    work_hours: HoursMatrix | dict[str, list[str]],
+    employees: Employees | None = None,
+) -> HoursReport:
+    work_hours = HoursMatrix.coerce(work_hours)
+    if not work_hours:
+        return HoursReport(t("no_data"), None, False)
+    hours_report = _prepare_hours_report(work_hours, employees)
+    with stage_seconds.labels(stage="render").time():
+        hours_report.image = await render_chart_async(
+            _chart_data(work_hours, employees)
+        )
+    return hours_report
+
+
+async def build_hours_reports_batch_async(
+    matrices: Mapping[K, HoursMatrix],
+    employees: Employees | None = None,
+) -> dict[K, HoursReport]:
+    reports = {
+        key: _prepare_hours_report(work_hours, employees) if work_hours else None
+        for key, work_hours in matrices.items()
+    }
+    with stage_seconds.labels(stage="render").time():
+        images = await render_charts_batch_async(
+            {
+                key: _chart_data(matrices[key], employees)
+                for key, report in reports.items()
+                if report is not None
+            }
+        )
+    for key, image in images.items():
+        reports[key].image = image  # type: ignore[union-attr]
+    return {
+        key: report if report is not None else HoursReport(t("no_data"), None, False)
+        for key, report in reports.items()
+    }
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+
+import translations
+from config import PRAISE_POOL_FILE, PRAISE_POOL_SIZE
+from llm import llm_client
+from translations import t
+
+PRAISE_MODEL = "qwen2.5"
+
+
+async def generate_praise(lang: str) -> str:
+    phrases_text = "\n".join([f"- {phrase}" for phrase in t("phrases", lang)])
+    return await llm_client.generate(
+        model=PRAISE_MODEL,
+        system=t("phrases_system", lang),
+        prompt=t("phrases_prompt", lang).format(phrases_text=phrases_text),
+        # The prompt never changes; a cached answer would fill the pool with one praise
+        use_cache=False,
+    )
+
+
+class PraisePool:
+    """Pre-generated praise messages per language, kept in a small JSON file.
+
+    The group job pops a message without touching the model; ``refill`` tops
+    the pool up off-peak.
+    """
+
+    def __init__(self, path: str = PRAISE_POOL_FILE, size: int = PRAISE_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._pools: dict[str, deque[str]] | None = None
+        self._refill_lock = asyncio.Lock()
+
+    @property
+    def pools(self) -> dict[str, deque[str]]:
+        if self._pools is None:
+            self._pools = {}
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path, encoding="utf-8") as file:
+                        stored = json.load(file)
+                    self._pools = {lang: deque(items) for lang, items in stored.items()}
+                except (OSError, ValueError, AttributeError) as error:
+                    logging.warning(f"Ignoring unreadable praise pool: {error}")
+        return self._pools
+
+    def pop(self, lang: str) -> str | None:
+        pool = self.pools.get(lang)
+        return pool.popleft() if pool else None
+
+    def available(self, lang: str) -> int:
+        return len(self.pools.get(lang, ()))
+
+    def _write(self, data: dict[str, list[str]]) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False, indent=2)
+        os.replace(temporary, self.path)
+
+    async def save(self) -> None:
+        data = {lang: list(pool) for lang, pool in self.pools.items()}
+        await asyncio.to_thread(self._write, data)
+
+    async def refill(self, lang: str | None = None) -> int:
+        lang = lang or translations.current_language
+        async with self._refill_lock:
+            pool = self.pools.setdefault(lang, deque())
+            added = 0
+            # Duplicate or empty answers still count as attempts
+            for _ in range(self.size * 2):
+                if len(pool) >= self.size:
+                    break
+                try:
+                    praise = (await generate_praise(lang)).strip()
+                except Exception as error:
+                    logging.warning(f"Praise pool refill for {lang} stopped: {error}")
+                    break
+                if not praise or praise in pool:
+                    continue
+                pool.append(praise)
+                added += 1
+            if added:
+                await self.save()
+            logging.info(f"Praise pool {lang}: {len(pool)} messages (+{added})")
+            return added
+
+
+praise_pool = PraisePool()
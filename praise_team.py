@@ -1,19 +1,19 @@
+import logging
 import secrets
 
-import ollama
-
+from metrics import ollama_fallbacks
+from praise_pool import praise_pool
+import translations
 from translations import t
 
 
-def praise_team():
-    phrases = t("phrases")
+async def praise_team():
+    praise = praise_pool.pop(translations.current_language)
+    if praise is None:
+        ollama_fallbacks.inc()
+        return secrets.choice(t("phrases"))
     try:
-        phrases_text = "\n".join([f"- {phrase}" for phrase in phrases])
-        response = ollama.generate(
-            model="qwen2.5",
-            system=t("phrases_system"),
-            prompt=t("phrases_prompt").format(phrases_text=phrases_text),
-        )
-        return response["response"]
-    except Exception:
-        return secrets.choice(phrases)
+        await praise_pool.save()
+    except OSError as error:
+        logging.warning(f"Could not save praise pool: {error}")
+    return praise
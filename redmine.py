@@ -1,49 +1,363 @@
+import logging
+import threading
 import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from functools import cache
+from html.parser import HTMLParser
+from typing import TYPE_CHECKING
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+import requests
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.webdriver.common.by import By
 
-from config import REDMINE_LOGIN_URL, REDMINE_USERNAME, REDMINE_PASSWORD, REPORT_URL
+from config import (
+    REDMINE_LOGIN_URL,
+    REDMINE_USERNAME,
+    REDMINE_PASSWORD,
+    REPORT_URL,
+    REDMINE_FETCHER,
+    REDMINE_HTTP_TIMEOUT,
+    CHROMEDRIVER_PATH,
+    DRIVER_POOL_SIZE,
+    DRIVER_MAX_USES,
+    DRIVER_MAX_HEAP_MB,
+)
+from metrics import fetch_page_bytes, fetch_phase_seconds, redmine_fallbacks
 from translations import t
 
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+# Selenium's WebDriver classes and webdriver-manager are imported on first use:
+# the default HTTP fetcher never needs them and they slow down bot startup.
+
+USER_AGENT = "Mozilla/5.0 Chrome/120.0.0.0 Safari/537.36"
+SESSION_COOKIE = "_redmine_session"
+
+
+class RedmineFetchError(Exception):
+    pass
+
+
+class _LoginPageParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.authenticity_token: str | None = None
+        self.has_login_form = False
+
+    def handle_starttag(self, tag, attrs):
+        attributes = dict(attrs)
+        # Redmine puts id="login-form" on the wrapping <div>, not on the <form>
+        if attributes.get("id") == "login-form" or (
+            tag == "input" and attributes.get("type") == "password"
+        ):
+            self.has_login_form = True
+        if tag == "input" and attributes.get("name") == "authenticity_token":
+            self.authenticity_token = attributes.get("value")
+        elif tag == "meta" and attributes.get("name") == "csrf-token":
+            self.authenticity_token = self.authenticity_token or attributes.get(
+                "content"
+            )
+
+
+def _parse_login_page(html: str) -> _LoginPageParser:
+    page = _LoginPageParser()
+    page.feed(html)
+    page.close()
+    return page
+
+
+@cache
+def chromedriver_path() -> str:
+    # webdriver-manager may hit the network, so resolve the binary only once
+    if CHROMEDRIVER_PATH:
+        return CHROMEDRIVER_PATH
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    return ChromeDriverManager().install()
+
 
 def get_webdriver():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
     options = Options()
     options.add_argument("--headless")
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("user-agent=Mozilla/5.0 Chrome/120.0.0.0 Safari/537.36")
-    return webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()), options=options
-    )
+    options.add_argument(f"user-agent={USER_AGENT}")
+    return webdriver.Chrome(service=Service(chromedriver_path()), options=options)
 
 
-def fetch_page_source() -> str:
-    with get_webdriver() as driver:
+class _PooledDriver:
+    def __init__(self, driver: "WebDriver"):
+        self.driver = driver
+        self.uses = 0
+
+
+class DriverPool:
+    """Keeps logged-in WebDriver sessions alive between fetches."""
+
+    def __init__(
+        self,
+        size: int = DRIVER_POOL_SIZE,
+        max_uses: int = DRIVER_MAX_USES,
+        max_heap_mb: int = DRIVER_MAX_HEAP_MB,
+        factory: Callable[[], "WebDriver"] = get_webdriver,
+    ):
+        self.max_uses = max_uses
+        self.max_heap_bytes = max_heap_mb * 1024 * 1024
+        self.factory = factory
+        self._idle: list[_PooledDriver] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _take(self) -> _PooledDriver:
+        while True:
+            with self._lock:
+                pooled = self._idle.pop() if self._idle else None
+            if pooled is None:
+                return _PooledDriver(self.factory())
+            if self._is_healthy(pooled):
+                return pooled
+            self._quit(pooled)
+
+    def _is_healthy(self, pooled: _PooledDriver) -> bool:
         try:
-            driver.get(REDMINE_LOGIN_URL)
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.ID, "username"))
-            ).send_keys(REDMINE_USERNAME)
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.ID, "password"))
-            ).send_keys(REDMINE_PASSWORD)
-            driver.find_element(By.NAME, "login").click()
-            time.sleep(3)
-            driver.get(REPORT_URL)
-            WebDriverWait(driver, 10).until(
-                lambda d: d.execute_script("return document.readyState") == "complete"
+            return pooled.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _heap_size(self, pooled: _PooledDriver) -> int:
+        try:
+            return int(
+                pooled.driver.execute_script(
+                    "return performance.memory ? performance.memory.usedJSHeapSize : 0"
+                )
+                or 0
             )
-            return driver.page_source
-        except TimeoutException:
-            return t("error_timeout")
-        except NoSuchElementException:
-            return t("error_no_element")
+        except Exception:
+            return 0
+
+    def _should_recycle(self, pooled: _PooledDriver) -> bool:
+        return (
+            pooled.uses >= self.max_uses
+            or self._heap_size(pooled) > self.max_heap_bytes
+        )
+
+    def _quit(self, pooled: _PooledDriver) -> None:
+        try:
+            pooled.driver.quit()
         except Exception as error:
-            return f"{t('error_generic')}: {error}"
+            logging.warning(f"Failed to quit WebDriver: {error}")
+
+    @contextmanager
+    def session(self) -> Iterator["WebDriver"]:
+        with self._slots:
+            pooled = self._take()
+            try:
+                yield pooled.driver
+            except BaseException:
+                # The page state is unknown after a failure, start over next time
+                self._quit(pooled)
+                raise
+            pooled.uses += 1
+            if self._should_recycle(pooled):
+                self._quit(pooled)
+            else:
+                with self._lock:
+                    self._idle.append(pooled)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            self._quit(pooled)
+
+
+driver_pool = DriverPool()
+
+
+@dataclass
+class FetchTimings:
+    backend: str
+    driver_start: float = 0.0
+    login: float = 0.0
+    report_load: float = 0.0
+    page_bytes: int = 0
+
+    @property
+    def total(self) -> float:
+        return self.driver_start + self.login + self.report_load
+
+    def as_dict(self) -> dict[str, float | int | str]:
+        return {**asdict(self), "total": self.total}
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            setattr(self, phase, getattr(self, phase) + time.perf_counter() - started)
+
+
+FETCH_PHASES = ("driver_start", "login", "report_load")
+
+
+@dataclass
+class FetchResult:
+    page_source: str
+    timings: FetchTimings
+
+
+def _report_ready(driver: "WebDriver") -> bool:
+    return bool(
+        driver.find_elements(By.CSS_SELECTOR, "tr.last-level")
+        or driver.find_elements(By.CSS_SELECTOR, "p.nodata")
+    )
+
+
+def _is_login_page(driver: "WebDriver") -> bool:
+    return bool(driver.find_elements(By.ID, "login-form"))
+
+
+def _login(driver: "WebDriver") -> None:
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    driver.get(REDMINE_LOGIN_URL)
+    WebDriverWait(driver, 10).until(
+        EC.presence_of_element_located((By.ID, "username"))
+    ).send_keys(REDMINE_USERNAME)
+    WebDriverWait(driver, 10).until(
+        EC.presence_of_element_located((By.ID, "password"))
+    ).send_keys(REDMINE_PASSWORD)
+    login_page_url = driver.current_url
+    session_cookie = driver.get_cookie(SESSION_COOKIE)
+    driver.find_element(By.NAME, "login").click()
+    # Redmine redirects and issues a new session cookie once login succeeds
+    WebDriverWait(driver, 10).until(
+        lambda d: d.current_url != login_page_url
+        or d.get_cookie(SESSION_COOKIE) != session_cookie
+    )
+
+
+def _load_report(driver: "WebDriver", report_url: str, timings: FetchTimings) -> None:
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    with timings.measure("report_load"):
+        driver.get(report_url)
+    # A fresh browser or an expired session cookie lands on the login form
+    if _is_login_page(driver):
+        with timings.measure("login"):
+            _login(driver)
+        with timings.measure("report_load"):
+            driver.get(report_url)
+    with timings.measure("report_load"):
+        WebDriverWait(driver, 10).until(_report_ready)
+
+
+def prepare_webdriver() -> None:
+    chromedriver_path()
+
+
+def fetch_report_selenium(report_url: str = REPORT_URL) -> FetchResult:
+    timings = FetchTimings("selenium")
+    try:
+        started = time.perf_counter()
+        with driver_pool.session() as driver:
+            timings.driver_start = time.perf_counter() - started
+            _load_report(driver, report_url, timings)
+            page_source = driver.page_source
+    except TimeoutException as error:
+        raise RedmineFetchError(t("error_timeout")) from error
+    except NoSuchElementException as error:
+        raise RedmineFetchError(t("error_no_element")) from error
+    except Exception as error:
+        raise RedmineFetchError(f"{t('error_generic')}: {error}") from error
+    timings.page_bytes = len(page_source.encode())
+    return FetchResult(page_source, timings)
+
+
+def fetch_report_http(
+    report_url: str = REPORT_URL,
+    login_url: str = REDMINE_LOGIN_URL,
+    username: str = REDMINE_USERNAME,
+    password: str = REDMINE_PASSWORD,
+    timeout: float = REDMINE_HTTP_TIMEOUT,
+) -> FetchResult:
+    timings = FetchTimings("http")
+    with requests.Session() as session:
+        session.headers["User-Agent"] = USER_AGENT
+        with timings.measure("login"):
+            login_page = session.get(login_url, timeout=timeout)
+            login_page.raise_for_status()
+            token = _parse_login_page(login_page.text).authenticity_token
+            if not token:
+                raise RedmineFetchError("authenticity token not found on login page")
+
+            response = session.post(
+                login_url,
+                data={
+                    "authenticity_token": token,
+                    "username": username,
+                    "password": password,
+                    "login": "Login",
+                },
+                timeout=timeout,
+            )
+            response.raise_for_status()
+            if _parse_login_page(response.text).has_login_form:
+                raise RedmineFetchError("login rejected")
+
+        with timings.measure("report_load"):
+            report = session.get(report_url, timeout=timeout)
+            report.raise_for_status()
+        if _parse_login_page(report.text).has_login_form:
+            raise RedmineFetchError("session was not accepted by the report page")
+        timings.page_bytes = len(report.content)
+        return FetchResult(report.text, timings)
+
+
+FETCHERS: dict[str, Callable[[str], FetchResult]] = {
+    "http": fetch_report_http,
+    "selenium": fetch_report_selenium,
+}
+
+
+def _fetch_report(report_url: str) -> FetchResult:
+    fetcher = FETCHERS.get(REDMINE_FETCHER, fetch_report_selenium)
+    if fetcher is fetch_report_selenium:
+        return fetcher(report_url)
+    try:
+        return fetcher(report_url)
+    except Exception as error:
+        redmine_fallbacks.inc()
+        logging.warning(
+            f"{REDMINE_FETCHER} fetcher failed, falling back to Selenium: {error}"
+        )
+        return fetch_report_selenium(report_url)
+
+
+def fetch_report(report_url: str = REPORT_URL) -> FetchResult:
+    result = _fetch_report(report_url)
+    timings = result.timings
+    for phase in FETCH_PHASES:
+        fetch_phase_seconds.labels(backend=timings.backend, phase=phase).observe(
+            getattr(timings, phase)
+        )
+    fetch_page_bytes.labels(backend=timings.backend).observe(timings.page_bytes)
+    logging.info(
+        f"Redmine fetch ({timings.backend}): driver start {timings.driver_start:.2f}s, "
+        f"login {timings.login:.2f}s, report {timings.report_load:.2f}s, "
+        f"{timings.page_bytes} bytes"
+    )
+    return result
+
+
+def fetch_page_source(report_url: str = REPORT_URL) -> str:
+    return fetch_report(report_url).page_source
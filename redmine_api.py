@@ -0,0 +1,111 @@
+import threading
+from collections import defaultdict
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, date, datetime, timedelta
+
+import requests
+
+import config
+from config import (
+    REDMINE_URL,
+    REDMINE_API_KEY,
+    REDMINE_API_WORKERS,
+    REDMINE_HTTP_TIMEOUT,
+    REPORT_DAYS,
+)
+from hours_matrix import HoursMatrix
+
+API_PAGE_LIMIT = 100
+
+
+def _get_page(
+    session: requests.Session, base_url: str, params: dict[str, str | int], offset: int
+) -> dict:
+    response = session.get(
+        f"{base_url}/time_entries.json",
+        params={**params, "limit": API_PAGE_LIMIT, "offset": offset},
+        timeout=REDMINE_HTTP_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def fetch_time_entries(
+    from_date: date,
+    to_date: date,
+    updated_since: datetime | None = None,
+    base_url: str = REDMINE_URL,
+    api_key: str = REDMINE_API_KEY,
+) -> list[dict]:
+    params: dict[str, str | int] = {
+        "from": from_date.isoformat(),
+        "to": to_date.isoformat(),
+    }
+    if updated_since is not None:
+        params["updated_on"] = ">=" + updated_since.strftime("%Y-%m-%dT%H:%M:%SZ")
+    with requests.Session() as session:
+        session.headers["X-Redmine-API-Key"] = api_key
+        first_page = _get_page(session, base_url, params, 0)
+        entries: list[dict] = first_page["time_entries"]
+        offsets = range(API_PAGE_LIMIT, first_page["total_count"], API_PAGE_LIMIT)
+        with ThreadPoolExecutor(max_workers=REDMINE_API_WORKERS) as executor:
+            pages = executor.map(
+                lambda offset: _get_page(session, base_url, params, offset), offsets
+            )
+            for page in pages:
+                entries.extend(page["time_entries"])
+    return entries
+
+
+def build_work_hours(
+    entries: Iterable[dict], from_date: date, to_date: date
+) -> HoursMatrix:
+    days_count = (to_date - from_date).days + 1
+    daily_hours: dict[str, list[float]] = defaultdict(lambda: [0.0] * days_count)
+    for entry in entries:
+        day_index = (date.fromisoformat(entry["spent_on"]) - from_date).days
+        if 0 <= day_index < days_count:
+            daily_hours[entry["user"]["name"]][day_index] += float(entry["hours"])
+    return HoursMatrix.from_rows(
+        (name, [*days, sum(days)])
+        for name, days in daily_hours.items()
+        if name in config.EMPLOYEES
+    )
+
+
+class TimeEntrySync:
+    def __init__(self, base_url: str = REDMINE_URL, api_key: str = REDMINE_API_KEY):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.entries: dict[int, dict] = {}
+        self.window: tuple[date, date] | None = None
+        self.last_sync: datetime | None = None
+        self._lock = threading.Lock()
+
+    def sync(self, from_date: date, to_date: date) -> HoursMatrix:
+        with self._lock:
+            # Deleted entries never show up in an incremental pull, so a full
+            # pull is done whenever the report window moves (once a day).
+            if self.window != (from_date, to_date):
+                self.entries.clear()
+                self.last_sync = None
+            started_at = datetime.now(UTC)
+            for entry in fetch_time_entries(
+                from_date, to_date, self.last_sync, self.base_url, self.api_key
+            ):
+                self.entries[entry["id"]] = entry
+            self.window = (from_date, to_date)
+            self.last_sync = started_at
+            return build_work_hours(self.entries.values(), from_date, to_date)
+
+
+time_entry_sync = TimeEntrySync()
+
+
+def fetch_work_hours(
+    days: int = REPORT_DAYS, to_date: date | None = None
+) -> HoursMatrix:
+    to_date = to_date or date.today()
+    from_date = to_date - timedelta(days=days - 1)
+    return time_entry_sync.sync(from_date, to_date)
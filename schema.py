@@ -1,5 +1,5 @@
 from datetime import date
-from pydantic import BaseModel, Field, field_validator, ConfigDict
+from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict
 
 
 class EmployeeData(BaseModel):
@@ -14,7 +14,40 @@ class EmployeeData(BaseModel):
         return v
 
 
+TIME_PATTERN = r"^([01]?\d|2[0-3]):[0-5]\d$"
+
+
+class TeamModel(BaseModel):
+    name: str
+    report_url: str
+    chat_id: int | str
+    employees: dict[str, EmployeeData]
+    schedule_time: str | None = Field(default=None, pattern=TIME_PATTERN)  # "16:45"
+    personal_schedule_time: str | None = Field(default=None, pattern=TIME_PATTERN)
+    timezone: str | None = None
+    schedule_days: str | None = None
+
+
 class ConfigModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
-    employees: dict[str, EmployeeData]
+    employees: dict[str, EmployeeData] = Field(default_factory=dict)
+    teams: list[TeamModel] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def check_teams(self):
+        if not self.employees and not self.teams:
+            raise ValueError("config must list employees or teams")
+        names = [team.name for team in self.teams]
+        if len(names) != len(set(names)):
+            raise ValueError("team names must be unique")
+        return self
+
+    def all_employees(self) -> dict[str, EmployeeData]:
+        # Without teams this is the employees dict itself
+        if not self.teams:
+            return self.employees
+        merged = dict(self.employees)
+        for team in self.teams:
+            merged.update(team.employees)
+        return merged
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from collections.abc import Mapping
+from functools import cached_property, partial
+
+import config
+from config import (
+    REPORT_FETCH_WORKERS,
+    REPORT_SNAPSHOT_MAX_AGE,
+    TIME_ENTRY_SOURCE,
+)
+from history import hours_history
+from metrics import inflight_fetches, redmine_failures, stage_seconds
+from hours_matrix import HoursMatrix
+from parser import parse_hours_matrix
+from redmine import fetch_page_source
+from redmine_api import fetch_work_hours
+from schema import EmployeeData
+from teams import Team, default_team
+
+
+@dataclass(frozen=True)
+class ReportSnapshot:
+    work_hours: HoursMatrix
+    fetched_at: float
+    employees: Mapping[str, EmployeeData] | None = None
+
+    def is_fresh(self, max_age: float) -> bool:
+        return time.monotonic() - self.fetched_at <= max_age
+
+    @cached_property
+    def names_by_telegram(self) -> dict[str, str]:
+        # Built once per snapshot and shared by every personal report
+        employees = config.EMPLOYEES if self.employees is None else self.employees
+        return {
+            _normalize_handle(employee.tg): name
+            for name, employee in employees.items()
+            if name in self.work_hours and getattr(employee, "tg", None)
+        }
+
+    def hours_for_telegram(self, username: str) -> HoursMatrix | None:
+        name = self.names_by_telegram.get(_normalize_handle(username))
+        return self.work_hours.employee(name) if name else None
+
+
+def _normalize_handle(handle: str) -> str:
+    return handle.removeprefix("@").lower()
+
+
+# Every team has its own cache entry, fetch lock and in-flight future, while
+# the fetch executor (and the Chrome/HTTP fetchers behind it) is shared.
+_snapshot_lock = threading.Lock()
+_snapshots: dict[str, ReportSnapshot] = {}
+_fetch_locks: dict[str, threading.Lock] = {}
+_inflight: dict[str, asyncio.Future[ReportSnapshot]] = {}
+_fetch_executor = ThreadPoolExecutor(
+    max_workers=REPORT_FETCH_WORKERS, thread_name_prefix="report-fetch"
+)
+
+
+def build_report_snapshot(team: Team | None = None) -> ReportSnapshot:
+    team = team or default_team()
+    to_date = date.today()
+    with inflight_fetches.track_inprogress():
+        try:
+            with stage_seconds.labels(stage="fetch").time():
+                if TIME_ENTRY_SOURCE == "api":
+                    work_hours = fetch_work_hours(to_date=to_date).select(
+                        team.employees
+                    )
+                else:
+                    page_source = fetch_page_source(team.report_url)
+        except Exception:
+            redmine_failures.labels(source=TIME_ENTRY_SOURCE).inc()
+            raise
+    if TIME_ENTRY_SOURCE == "api":
+        _record_history(team, work_hours, to_date)
+    else:
+        # The report page's columns aren't dated: REPORT_URL may cover any
+        # period, so its hours are never stored under guessed days
+        with stage_seconds.labels(stage="parse").time():
+            work_hours = parse_hours_matrix(page_source, team.employees)
+    return ReportSnapshot(
+        work_hours=work_hours, fetched_at=time.monotonic(), employees=team.employees
+    )
+
+
+def _record_history(team: Team, work_hours: HoursMatrix, to_date: date) -> None:
+    # The API window is exactly the last REPORT_DAYS days up to to_date
+    try:
+        changed = hours_history.record(work_hours, to_date, team.employees)
+        if changed:
+            logging.info(f"Hours history ({team.name}): {changed} cells updated")
+    except Exception as error:
+        logging.warning(f"Could not record hours history for {team.name}: {error}")
+
+
+def _cached_snapshot(team: Team, max_age: float) -> ReportSnapshot | None:
+    with _snapshot_lock:
+        snapshot = _snapshots.get(team.name)
+        if snapshot is not None and snapshot.is_fresh(max_age):
+            return snapshot
+        return None
+
+
+def _fetch_lock(team: Team) -> threading.Lock:
+    with _snapshot_lock:
+        return _fetch_locks.setdefault(team.name, threading.Lock())
+
+
+def get_report_snapshot(
+    max_age: float = REPORT_SNAPSHOT_MAX_AGE, team: Team | None = None
+) -> ReportSnapshot:
+    team = team or default_team()
+    with _fetch_lock(team):
+        snapshot = _cached_snapshot(team, max_age)
+        if snapshot is not None:
+            return snapshot
+        snapshot = build_report_snapshot(team)
+        # An empty report usually means the fetch failed, so don't cache it
+        if snapshot.work_hours:
+            with _snapshot_lock:
+                _snapshots[team.name] = snapshot
+        return snapshot
+
+
+async def get_report_snapshot_async(
+    max_age: float = REPORT_SNAPSHOT_MAX_AGE, team: Team | None = None
+) -> ReportSnapshot:
+    team = team or default_team()
+    snapshot = _cached_snapshot(team, max_age)
+    if snapshot is not None:
+        return snapshot
+    # Callers arriving during a fetch wait for it instead of starting another
+    inflight = _inflight.get(team.name)
+    if inflight is None:
+        inflight = asyncio.get_running_loop().run_in_executor(
+            _fetch_executor, get_report_snapshot, max_age, team
+        )
+        _inflight[team.name] = inflight
+        inflight.add_done_callback(partial(_clear_inflight, team.name))
+    return await asyncio.shield(inflight)
+
+
+def _clear_inflight(name: str, future: asyncio.Future[ReportSnapshot]) -> None:
+    if _inflight.get(name) is future:
+        del _inflight[name]
+
+
+def invalidate_report_snapshot(team: Team | None = None) -> None:
+    with _snapshot_lock:
+        if team is None:
+            _snapshots.clear()
+        else:
+            _snapshots.pop(team.name, None)
@@ -0,0 +1,39 @@
+import sqlite3
+import threading
+
+
+class SQLiteStore:
+    """Lazily opened SQLite (WAL) connection, shared by threads under a lock.
+
+    Subclasses set ``schema`` and may override ``_prepare`` for work done once
+    after the schema is created (pruning, imports).
+    """
+
+    schema = ""
+
+    def __init__(self, path: str | None):
+        self.path = path
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(
+                str(self.path), isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA busy_timeout=5000")
+            connection.executescript(self.schema)
+            self._connection = connection
+            self._prepare(connection)
+        return self._connection
+
+    def _prepare(self, connection: sqlite3.Connection) -> None:
+        pass
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
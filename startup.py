@@ -0,0 +1,57 @@
+import os
+import subprocess  # nosec B404
+import sys
+import time
+from collections import defaultdict
+
+# Imported first by bot.py, so this is as close to process start as we get
+STARTED = time.perf_counter()
+
+_phases: list[tuple[str, float]] = []
+
+
+def mark(phase: str) -> None:
+    _phases.append((phase, time.perf_counter() - STARTED))
+
+
+def import_times(module: str = "bot") -> list[tuple[str, float]]:
+    """Seconds ``module`` spends importing each package, from ``-X importtime``."""
+    # nosec B603
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=False,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )  # nosec B603
+    # Children are printed before their parent, indented one level deeper
+    children: dict[str, int] = defaultdict(int)
+    for line in result.stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2].strip()
+        depth = (len(fields[2]) - len(fields[2].lstrip()) - 1) // 2
+        if depth == 1:
+            children[name.split(".")[0]] += int(fields[1])
+        elif depth == 0:
+            if name == module:
+                break
+            children = defaultdict(int)
+    else:
+        children = defaultdict(int)
+    return sorted(
+        ((name, microseconds / 1e6) for name, microseconds in children.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+
+
+def startup_report(limit: int = 15) -> str:
+    lines = ["Startup phases (seconds since interpreter reached bot.py):"]
+    lines += [f"  {phase:<24} {elapsed:7.3f}" for phase, elapsed in _phases]
+    lines.append("Slowest imports (cumulative seconds, -X importtime):")
+    lines += [
+        f"  {name:<24} {seconds:7.3f}" for name, seconds in import_times()[:limit]
+    ]
+    return "\n".join(lines)
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import time
+
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import Message
+
+from config import STREAM_EDIT_INTERVAL
+
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+
+def split_message(text: str, limit: int = TELEGRAM_MESSAGE_LIMIT) -> list[str]:
+    """Splits text into Telegram-sized parts, preferring line and word breaks."""
+    parts = []
+    while len(text) > limit:
+        newline = text.rfind("\n", 0, limit + 1)
+        cut = newline if newline > 0 else text.rfind(" ", 0, limit + 1)
+        if cut > 0:
+            parts.append(text[:cut])
+            text = text[cut + 1 :]
+        else:
+            parts.append(text[:limit])
+            text = text[limit:]
+    parts.append(text)
+    return parts
+
+
+class StreamingReply:
+    """Shows a growing answer as a reply that is edited at a throttled rate.
+
+    Text past the Telegram limit continues in follow-up messages.
+    """
+
+    def __init__(
+        self,
+        message: Message,
+        interval: float = STREAM_EDIT_INTERVAL,
+        limit: int = TELEGRAM_MESSAGE_LIMIT,
+    ):
+        self.message = message
+        self.interval = interval
+        self.limit = limit
+        self.replies: list[Message] = []
+        self.shown: list[str] = []
+        self._next_update = 0.0
+
+    async def update(self, text: str) -> None:
+        if time.monotonic() < self._next_update or not text.strip():
+            return
+        await self._show(text)
+
+    async def finish(self, text: str) -> None:
+        while True:
+            try:
+                await self._show(text, retry=False)
+                return
+            except TelegramRetryAfter as error:
+                await asyncio.sleep(error.retry_after)
+
+    async def _show(self, text: str, retry: bool = True) -> None:
+        self._next_update = time.monotonic() + self.interval
+        for index, part in enumerate(split_message(text, self.limit)):
+            if not part.strip():
+                continue
+            try:
+                await self._show_part(index, part)
+            except TelegramRetryAfter as error:
+                if not retry:
+                    raise
+                self._next_update = time.monotonic() + error.retry_after
+                return
+
+    async def _show_part(self, index: int, part: str) -> None:
+        if index < len(self.replies):
+            if self.shown[index] == part:
+                return
+            try:
+                await self.replies[index].edit_text(part)
+            except TelegramBadRequest as error:
+                if "message is not modified" not in str(error):
+                    raise
+                logging.debug(f"Skipped unchanged edit: {error}")
+            self.shown[index] = part
+        else:
+            self.replies.append(await self.message.answer(part))
+            self.shown.append(part)
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+
+from config import SUBSCRIBERS_DB, SUBSCRIBERS_FILE
+from sqlite_store import SQLiteStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS subscribers (
+    user_id INTEGER PRIMARY KEY,
+    username TEXT,
+    subscribe INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS subscribers_username ON subscribers (username);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+UPSERT = """
+INSERT INTO subscribers (user_id, username, subscribe, updated_at)
+VALUES (?, ?, ?, ?)
+ON CONFLICT (user_id) DO UPDATE SET
+    username = excluded.username,
+    subscribe = excluded.subscribe,
+    updated_at = excluded.updated_at
+"""
+
+
+@dataclass(frozen=True)
+class Subscriber:
+    user_id: int
+    username: str | None
+    subscribe: bool
+
+
+class SubscriberStore(SQLiteStore):
+    """SQLite (WAL) subscriber repository with a one-time subscribers.json import."""
+
+    schema = SCHEMA
+
+    def __init__(
+        self, path: str = SUBSCRIBERS_DB, legacy_json: str | None = SUBSCRIBERS_FILE
+    ):
+        super().__init__(path)
+        self.legacy_json = legacy_json
+
+    def _prepare(self, connection: sqlite3.Connection) -> None:
+        self._import_legacy_json(connection)
+
+    def _import_legacy_json(self, connection: sqlite3.Connection) -> None:
+        if not self.legacy_json or not os.path.exists(self.legacy_json):
+            return
+        if connection.execute(
+            "SELECT 1 FROM meta WHERE key = 'json_imported'"
+        ).fetchone():
+            return
+        with open(self.legacy_json, encoding="utf-8") as f:
+            subscribers_data: dict[str, dict] = json.load(f)
+        now = time.time()
+        with connection:
+            connection.execute("BEGIN")
+            connection.executemany(
+                UPSERT,
+                [
+                    (int(user_id), data.get("username"), bool(data["subscribe"]), now)
+                    for user_id, data in subscribers_data.items()
+                ],
+            )
+            connection.execute(
+                "INSERT INTO meta (key, value) VALUES ('json_imported', ?)",
+                (self.legacy_json,),
+            )
+        logging.info(
+            f"Imported {len(subscribers_data)} subscribers from {self.legacy_json}"
+        )
+
+    def upsert(self, user_id: int, username: str | None, subscribe: bool) -> None:
+        with self._lock:
+            self._connect().execute(UPSERT, (user_id, username, subscribe, time.time()))
+
+    def active_subscribers(self) -> list[Subscriber]:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT user_id, username, subscribe FROM subscribers"
+                " WHERE subscribe = 1 ORDER BY user_id"
+            )
+            return [Subscriber(row[0], row[1], bool(row[2])) for row in rows]
+
+    def find_by_username(self, username: str) -> Subscriber | None:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT user_id, username, subscribe FROM subscribers"
+                    " WHERE username = ?",
+                    (username,),
+                )
+                .fetchone()
+            )
+        return Subscriber(row[0], row[1], bool(row[2])) if row else None
+
+    def count(self) -> int:
+        with self._lock:
+            return (
+                self._connect()
+                .execute("SELECT COUNT(*) FROM subscribers WHERE subscribe = 1")
+                .fetchone()[0]
+            )
+
+    async def upsert_async(
+        self, user_id: int, username: str | None, subscribe: bool
+    ) -> None:
+        await asyncio.to_thread(self.upsert, user_id, username, subscribe)
+
+    async def active_subscribers_async(self) -> list[Subscriber]:
+        return await asyncio.to_thread(self.active_subscribers)
+
+    async def count_async(self) -> int:
+        return await asyncio.to_thread(self.count)
+
+
+subscriber_store = SubscriberStore()
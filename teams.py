@@ -0,0 +1,110 @@
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from pytz import timezone
+
+import config
+from config import (
+    REPORT_URL,
+    SCHEDULE_DAYS,
+    SCHEDULE_TIME,
+    SCHEDULE_TIME_PERSONAL,
+    TELEGRAM_CHAT_ID,
+    TimeConfig,
+)
+from schema import EmployeeData, TeamModel
+
+DEFAULT_TEAM = "default"
+
+
+@dataclass(frozen=True, eq=False)
+class Team:
+    name: str
+    report_url: str
+    chat_id: str
+    employees: Mapping[str, EmployeeData]
+    schedule_time: TimeConfig = SCHEDULE_TIME
+    personal_schedule_time: TimeConfig = SCHEDULE_TIME_PERSONAL
+    schedule_days: str = SCHEDULE_DAYS
+
+    def has_member(self, username: str) -> bool:
+        handle = username.removeprefix("@").lower()
+        return any(
+            employee.tg.removeprefix("@").lower() == handle
+            for employee in self.employees.values()
+        )
+
+
+def _time_config(
+    value: str | None, zone: str | None, default: TimeConfig
+) -> TimeConfig:
+    tz = timezone(zone) if zone else default.timezone
+    if value is None:
+        return TimeConfig(hour=default.hour, minute=default.minute, timezone=tz)
+    hour, minute = value.split(":")
+    return TimeConfig(hour=int(hour), minute=int(minute), timezone=tz)
+
+
+def _from_model(model: TeamModel) -> Team:
+    return Team(
+        name=model.name,
+        report_url=model.report_url,
+        chat_id=str(model.chat_id),
+        employees=model.employees,
+        schedule_time=_time_config(model.schedule_time, model.timezone, SCHEDULE_TIME),
+        personal_schedule_time=_time_config(
+            model.personal_schedule_time, model.timezone, SCHEDULE_TIME_PERSONAL
+        ),
+        schedule_days=model.schedule_days or SCHEDULE_DAYS,
+    )
+
+
+def _legacy_team() -> Team:
+    """The single team described by REPORT_URL, TELEGRAM_CHAT_ID and employees."""
+    for var, value in (
+        ("REPORT_URL", REPORT_URL),
+        ("TELEGRAM_CHAT_ID", TELEGRAM_CHAT_ID),
+    ):
+        if not value:
+            raise OSError(f"Missing required environment variable: {var}")
+    return Team(
+        name=DEFAULT_TEAM,
+        report_url=REPORT_URL,
+        chat_id=TELEGRAM_CHAT_ID,
+        employees=config.EMPLOYEES,
+    )
+
+
+_teams: tuple[Team, ...] | None = None
+_teams_lock = threading.Lock()
+
+
+def load_teams() -> tuple[Team, ...]:
+    global _teams
+    with _teams_lock:
+        if _teams is None:
+            models = config.config.teams
+            _teams = (
+                tuple(_from_model(model) for model in models)
+                if models
+                else (_legacy_team(),)
+            )
+        return _teams
+
+
+def default_team() -> Team:
+    return load_teams()[0]
+
+
+def team_for_chat(chat_id: int | str, username: str | None = None) -> Team:
+    """The team whose chat this is, else the first team ``username`` belongs to."""
+    teams = load_teams()
+    for team in teams:
+        if team.chat_id == str(chat_id):
+            return team
+    if username:
+        for team in teams:
+            if team.has_member(username):
+                return team
+    return teams[0]
@@ -1,8 +1,9 @@
 import pytest
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from unittest.mock import patch
 
 from parser import _adjust_rate_for_vacation
+from work_calendar import WorkCalendar, holidays_ru
 
 
 @pytest.fixture
@@ -89,6 +90,7 @@ class TestAdjustRateForVacation:
             1
             for i in range(report_days)
             if (report_start + timedelta(days=i)).weekday() < 5
+            and report_start + timedelta(days=i) not in holidays_ru
         )
         expected_rate = 1000.0 * (1 / total_workdays)
         assert result == expected_rate
@@ -126,7 +128,7 @@ class TestAdjustRateForVacation:
         result = _adjust_rate_for_vacation("Employee1", 1)
 
         # Если это рабочий день и он в отпуске
-        if today.weekday() < 5:
+        if today.weekday() < 5 and today not in holidays_ru:
             expected_rate = 1000.0 * (1 / 1)  # Минимальная ставка
         else:
             expected_rate = 1000.0  # Выходной - ставка не меняется
@@ -173,3 +175,24 @@ def test_vacation_effect_on_rate(
         assert result < rate
     else:
         assert result == rate
+
+
+def test_work_calendar_counts_holidays():
+    # 1-2 и 8-9 мая 2025 - праздники, остальные будни рабочие
+    calendar = WorkCalendar(date(2025, 4, 28), date(2025, 5, 11))
+    assert calendar.total_workdays == 6
+    assert calendar.workdays(date(2025, 5, 1), date(2025, 5, 4)) == 0
+    assert calendar.workdays(date(2025, 4, 1), date(2025, 4, 29)) == 2
+
+
+def test_work_calendar_vectorized_rates():
+    calendar = WorkCalendar(date(2025, 5, 19), date(2025, 5, 25))
+    employees = [
+        TestEmployee(rate=1.0),
+        TestEmployee(rate=0.5, vacation_range=[date(2025, 5, 19), date(2025, 5, 20)]),
+        TestEmployee(rate=1.0, vacation_range=[date(2025, 5, 1), date(2025, 6, 1)]),
+        None,
+    ]
+    assert calendar.vacation_workdays(employees).tolist() == [0, 2, 5, 0]
+    assert calendar.effective_rates(employees).tolist() == [1.0, 0.3, 0.2, 1.0]
+    assert calendar.on_full_vacation(employees).tolist() == [False, False, True, False]
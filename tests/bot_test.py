@@ -1,3 +1,4 @@
+import asyncio
 import datetime
 import pytest
 from unittest import mock
@@ -6,7 +7,11 @@ import bot
 from bot import is_working_day, scheduled_time_check, validate_env_vars
 from aiogram import Bot
 
+from hours_matrix import HoursMatrix
 from parser import HoursReport
+from snapshot import ReportSnapshot
+from subscribers import SubscriberStore
+from teams import default_team
 
 
 def test_is_working_day_weekday(mocker):
@@ -33,10 +38,12 @@ def test_is_working_day_holiday(mocker):
 @pytest.mark.asyncio
 async def test_scheduled_time_check_with_image(mocker):
     fake_bot = mock.AsyncMock(spec=Bot)
-    mocker.patch("bot.fetch_page_source", return_value="<html>...</html>")
-    mocker.patch("bot.extract_last_level_rows", return_value="parsed_html")
     mocker.patch(
-        "bot.format_hours_report",
+        "bot.get_report_snapshot_async",
+        return_value=ReportSnapshot(HoursMatrix.coerce({"A": ["8"]}), 0.0),
+    )
+    mocker.patch(
+        "bot.build_hours_report_async",
         return_value=HoursReport("Test report", b"image-bytes", True),
     )
     await scheduled_time_check(fake_bot)
@@ -49,10 +56,12 @@ async def test_scheduled_time_check_with_image(mocker):
 @pytest.mark.asyncio
 async def test_scheduled_time_check_text_only(mocker):
     fake_bot = mock.AsyncMock(spec=Bot)
-    mocker.patch("bot.fetch_page_source", return_value="<html>...</html>")
-    mocker.patch("bot.extract_last_level_rows", return_value="parsed_html")
     mocker.patch(
-        "bot.format_hours_report",
+        "bot.get_report_snapshot_async",
+        return_value=ReportSnapshot(HoursMatrix.coerce({"A": ["8"]}), 0.0),
+    )
+    mocker.patch(
+        "bot.build_hours_report_async",
         return_value=HoursReport("Text-only report", None, True),
     )
     await scheduled_time_check(fake_bot)
@@ -64,7 +73,7 @@ async def test_scheduled_time_check_text_only(mocker):
 @pytest.mark.asyncio
 async def test_scheduled_time_check_with_exception(mocker):
     fake_bot = mock.AsyncMock(spec=Bot)
-    mocker.patch("bot.fetch_page_source", side_effect=RuntimeError("fail"))
+    mocker.patch("bot.get_report_snapshot_async", side_effect=RuntimeError("fail"))
     mocker.patch("bot.t", return_value="Ошибка")
     await scheduled_time_check(fake_bot)
     fake_bot.send_message.assert_awaited_once()
@@ -94,3 +103,77 @@ def test_validate_env_vars_missing(monkeypatch):
         OSError, match="Missing required environment variable: BOT_TOKEN"
     ):
         validate_env_vars()
+
+
+@pytest.mark.asyncio
+async def test_scheduled_personal_time_check_fetches_once(mocker, tmp_path):
+    store = SubscriberStore(str(tmp_path / "subscribers.db"), legacy_json=None)
+    store.upsert(1, "johndoe", True)
+    store.upsert(2, "janesmith", True)
+    store.upsert(3, "someone", False)
+    mocker.patch("bot.subscriber_store", store)
+    snapshot = ReportSnapshot(
+        HoursMatrix.coerce({"John Doe": ["8"], "Jane Smith": ["4"]}), 0.0
+    )
+    get_snapshot = mocker.patch("bot.get_report_snapshot_async", return_value=snapshot)
+    report = HoursReport("Personal report", None, False)
+    build = mocker.patch(
+        "bot.build_hours_reports_batch_async",
+        side_effect=lambda slices, employees: {user_id: report for user_id in slices},
+    )
+    send = mocker.patch("bot.send_hours_report", new=mock.AsyncMock())
+    await bot.scheduled_personal_time_check(mock.AsyncMock(spec=Bot))
+    get_snapshot.assert_called_once()
+    build.assert_called_once()
+    (slices,) = build.call_args.args
+    assert slices[1] == snapshot.hours_for_telegram("johndoe")
+    assert slices[2] == snapshot.hours_for_telegram("janesmith")
+    assert send.await_count == 2
+    assert {c.kwargs["chat_id"] for c in send.await_args_list} == {1, 2}
+
+
+def test_start_scheduler_registers_jobs_on_day_off(mocker):
+    mocker.patch("bot.is_working_day", return_value=False)
+    scheduler = mocker.patch("bot.scheduler")
+    bot.start_scheduler(mock.AsyncMock(spec=Bot))
+    ids = [c.kwargs.get("id") for c in scheduler.add_job.call_args_list]
+    assert ids == ["default:group", "default:personal", None]
+    scheduler.start.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_team_job_skipped_on_holiday(mocker):
+    holiday = datetime.date(2025, 1, 1)
+    mocker.patch("bot.holidays_ru", new=[holiday])
+    mocker.patch("bot.datetime", wraps=datetime)
+    bot.datetime.datetime.now = lambda tz: datetime.datetime(2025, 1, 1, 16, 45)
+    job = mock.AsyncMock(__name__="job")
+    await bot.run_team_job(job, mock.AsyncMock(spec=Bot), default_team(), None)
+    job.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_team_jobs_do_not_overlap(mocker):
+    mocker.patch("bot.is_working_day", return_value=True)
+    running = []
+
+    async def job(bot_, team):
+        running.append(team.name)
+        assert len(running) == 1
+        await asyncio.sleep(0.01)
+        running.pop()
+
+    team = default_team()
+    await asyncio.gather(
+        bot.run_team_job(job, mock.AsyncMock(spec=Bot), team, None),
+        bot.run_team_job(job, mock.AsyncMock(spec=Bot), team, None),
+    )
+    assert running == []
+
+
+@pytest.mark.asyncio
+async def test_resolve_webdriver_failure_is_logged(mocker):
+    mocker.patch("bot.prepare_webdriver", side_effect=OSError("offline"))
+    warning = mocker.patch("bot.logging.warning")
+    await bot.resolve_webdriver()
+    assert "offline" in warning.call_args.args[0]
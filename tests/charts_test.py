@@ -0,0 +1,84 @@
+import pytest
+
+import charts
+from charts import (
+    ChartData,
+    render_chart,
+    render_chart_async,
+    render_chart_cached,
+    render_charts_batch,
+    render_charts_batch_async,
+)
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+@pytest.fixture
+def chart_data():
+    return ChartData(
+        names=("Alice", "Bob"),
+        hours=(38.5, 12.0),
+        labels=("38.5", "12"),
+        colors=("skyblue", "hotpink"),
+        norm=40,
+        legend=("Weekly norm", "50% of norm", "Weekends"),
+    )
+
+
+@pytest.fixture(autouse=True)
+def clean_cache(mocker):
+    mocker.patch("charts.CHART_EXECUTOR", "thread")
+    charts._reset_executor()
+    charts._cache.clear()
+    yield
+    charts._reset_executor()
+
+
+def test_render_chart_png(chart_data):
+    assert render_chart(chart_data).startswith(PNG_SIGNATURE)
+
+
+def test_render_chart_cached_by_digest(mocker, chart_data):
+    spy = mocker.spy(charts, "_get_executor")
+    first = render_chart_cached(chart_data)
+    second = render_chart_cached(ChartData(**chart_data.__dict__))
+    assert first is second
+    assert spy.call_count == 1
+
+
+def test_cache_evicts_oldest(mocker, chart_data):
+    mocker.patch("charts.CHART_CACHE_SIZE", 1)
+    render_chart_cached(chart_data)
+    other = ChartData(**{**chart_data.__dict__, "hours": (1.0, 2.0)})
+    render_chart_cached(other)
+    assert list(charts._cache) == [other.digest()]
+
+
+@pytest.mark.asyncio
+async def test_render_chart_async_in_process_pool(mocker, chart_data):
+    mocker.patch("charts.CHART_EXECUTOR", "process")
+    image = await render_chart_async(chart_data)
+    assert image.startswith(PNG_SIGNATURE)
+    assert await render_chart_async(chart_data) is image
+
+
+def test_render_charts_batch_reuses_figure(chart_data):
+    other = ChartData(**{**chart_data.__dict__, "hours": (1.0, 60.0)})
+    single = ChartData(**{**chart_data.__dict__, "names": ("Alice",), "hours": (8.0,)})
+    images = render_charts_batch([chart_data, other, single])
+    assert all(image.startswith(PNG_SIGNATURE) for image in images)
+    assert len(set(images)) == 3
+
+
+@pytest.mark.asyncio
+async def test_render_charts_batch_async_single_submit(mocker, chart_data):
+    cached = render_chart_cached(chart_data)
+    other = ChartData(**{**chart_data.__dict__, "hours": (1.0, 2.0)})
+    spy = mocker.spy(charts, "_get_executor")
+    images = await render_charts_batch_async(
+        {"a": chart_data, "b": other, "c": ChartData(**other.__dict__)}
+    )
+    assert images["a"] is cached
+    assert images["b"] is images["c"]
+    assert images["b"].startswith(PNG_SIGNATURE)
+    assert spy.call_count == 1
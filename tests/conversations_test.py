@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from conversations import ConversationStore
+
+
+def test_history_keeps_last_turns():
+    store = ConversationStore(path=None, max_turns=3)
+    for index in range(5):
+        store.append(1, "user", f"message {index}")
+    assert [turn["content"] for turn in store.history(1)] == [
+        "message 2",
+        "message 3",
+        "message 4",
+    ]
+    assert store.bytes_used == sum(
+        len(turn["role"]) + len(turn["content"]) for turn in store.history(1)
+    )
+
+
+def test_least_recently_used_user_is_evicted():
+    store = ConversationStore(path=None, max_users=2)
+    store.append(1, "user", "one")
+    store.append(2, "user", "two")
+    store.history(1)
+    store.append(3, "user", "three")
+    assert len(store) == 2
+    assert store.history(2) == []
+
+
+def test_byte_budget_trims_and_evicts():
+    store = ConversationStore(path=None, max_bytes=40)
+    store.append(1, "user", "x" * 20)
+    store.append(2, "user", "y" * 20)
+    assert len(store) == 1
+    store.append(2, "user", "z" * 20)
+    assert [turn["content"] for turn in store.history(2)] == ["z" * 20]
+    assert store.bytes_used <= 40
+
+
+def test_idle_history_expires(mocker):
+    store = ConversationStore(path=None, ttl=60)
+    clock = mocker.patch("conversations.time.monotonic", return_value=0.0)
+    store.append(1, "user", "old")
+    clock.return_value = 61.0
+    assert store.history(1) == []
+
+
+def test_history_persists_and_loads_lazily(tmp_path):
+    path = str(tmp_path / "conversations.db")
+    store = ConversationStore(path=path)
+    store.append(1, "user", "hello")
+    store.append(1, "assistant", "hi")
+    store.close()
+
+    reopened = ConversationStore(path=path)
+    assert len(reopened) == 0
+    assert reopened.history(1) == [
+        {"role": "user", "content": "hello"},
+        {"role": "assistant", "content": "hi"},
+    ]
+    reopened.clear(1)
+    reopened.close()
+    assert ConversationStore(path=path).history(1) == []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_appends(tmp_path):
+    store = ConversationStore(path=str(tmp_path / "conversations.db"), max_turns=100)
+    await asyncio.gather(
+        *(
+            store.append_async(user_id % 5, "user", str(user_id))
+            for user_id in range(50)
+        )
+    )
+    histories = [await store.history_async(user_id) for user_id in range(5)]
+    assert sum(len(history) for history in histories) == 50
+    store.close()
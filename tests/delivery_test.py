@@ -0,0 +1,83 @@
+import asyncio
+import time
+from unittest import mock
+
+import pytest
+from aiogram.exceptions import (
+    TelegramForbiddenError,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+)
+
+from delivery import Delivery, DeliveryPipeline, TokenBucket
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=20, capacity=1)
+    started = time.monotonic()
+    for _ in range(5):
+        await bucket.acquire()
+    assert time.monotonic() - started >= 0.18
+
+
+@pytest.mark.asyncio
+async def test_deliver_runs_in_parallel():
+    in_flight = 0
+    peak = 0
+
+    async def send():
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+
+    pipeline = DeliveryPipeline(concurrency=4, global_rate=1000, chat_rate=1000)
+    stats = await pipeline.deliver(Delivery(chat_id, send) for chat_id in range(12))
+    assert stats.sent == 12
+    assert peak == 4
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_honoured_and_nobody_dropped():
+    flood = TelegramRetryAfter(method=mock.Mock(), message="flood", retry_after=0)
+    send = mock.AsyncMock(side_effect=[flood, None])
+    pipeline = DeliveryPipeline(concurrency=2, global_rate=1000, chat_rate=1000)
+    stats = await pipeline.deliver([Delivery(1, send)])
+    assert send.await_count == 2
+    assert (stats.sent, stats.failed, stats.retried) == (1, 0, 1)
+
+
+@pytest.mark.asyncio
+async def test_flood_waits_do_not_use_retry_budget():
+    flood = TelegramRetryAfter(method=mock.Mock(), message="flood", retry_after=0)
+    send = mock.AsyncMock(side_effect=[flood] * 3 + [None])
+    pipeline = DeliveryPipeline(global_rate=1000, chat_rate=1000, max_retries=0)
+    stats = await pipeline.deliver([Delivery(1, send)])
+    assert send.await_count == 4
+    assert (stats.sent, stats.failed, stats.retried) == (1, 0, 3)
+
+
+@pytest.mark.asyncio
+async def test_no_backoff_after_last_attempt(mocker):
+    sleep = mocker.patch("delivery.asyncio.sleep", new=mock.AsyncMock())
+    down = TelegramNetworkError(method=mock.Mock(), message="down")
+    send = mock.AsyncMock(side_effect=down)
+    pipeline = DeliveryPipeline(global_rate=1000, chat_rate=1000, max_retries=2)
+    stats = await pipeline.deliver([Delivery(1, send)])
+    assert send.await_count == 3
+    # Rate limiter waits are fractions of a second; backoffs are whole seconds
+    delays = [call.args[0] for call in sleep.await_args_list]
+    assert [delay for delay in delays if delay >= 1] == [1, 2]
+    assert stats.failed_chats == [1]
+
+
+@pytest.mark.asyncio
+async def test_forbidden_chat_is_not_retried():
+    blocked = TelegramForbiddenError(method=mock.Mock(), message="bot was blocked")
+    send = mock.AsyncMock(side_effect=blocked)
+    stats = await DeliveryPipeline().deliver([Delivery(7, send)])
+    assert send.await_count == 1
+    assert stats.failed_chats == [7]
+    assert "failed 1" in str(stats)
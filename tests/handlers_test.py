@@ -1,20 +1,26 @@
 import pytest
 from aiogram.types import Message
 from handlers import manual_check
+from hours_matrix import HoursMatrix
 from parser import HoursReport
+from snapshot import ReportSnapshot
 
 
 @pytest.mark.asyncio
 async def test_manual_check_success(mocker):
-    mocker.patch("handlers.fetch_page_source", return_value="<html>sample</html>")
-    mocker.patch("handlers.extract_last_level_rows", return_value="parsed_html")
+    mocker.patch(
+        "handlers.get_report_snapshot_async",
+        return_value=ReportSnapshot(HoursMatrix.coerce({"A": ["8"]}), 0.0),
+    )
 
-    mocked_format = mocker.patch("handlers.format_hours_report")
+    mocked_format = mocker.patch("handlers.build_hours_report_async")
     mocked_format.return_value = HoursReport(
         "<b>Report text</b>", b"fake_image_data", False
     )
 
     mock_message = mocker.Mock(spec=Message)
+    mock_message.chat = mocker.Mock(id=-1, type="group")
+    mock_message.from_user = None
     mock_message.answer_photo = mocker.AsyncMock()
     mock_message.answer = mocker.AsyncMock()
 
@@ -28,13 +34,17 @@ async def test_manual_check_success(mocker):
 
 @pytest.mark.asyncio
 async def test_manual_check_text_only(mocker):
-    mocker.patch("handlers.fetch_page_source", return_value="<html>sample</html>")
-    mocker.patch("handlers.extract_last_level_rows", return_value="parsed_html")
+    mocker.patch(
+        "handlers.get_report_snapshot_async",
+        return_value=ReportSnapshot(HoursMatrix.coerce({"A": ["8"]}), 0.0),
+    )
 
-    mocked_format = mocker.patch("handlers.format_hours_report")
+    mocked_format = mocker.patch("handlers.build_hours_report_async")
     mocked_format.return_value = HoursReport("<b>Report no image</b>", None, None)
 
     mock_message = mocker.Mock(spec=Message)
+    mock_message.chat = mocker.Mock(id=-1, type="group")
+    mock_message.from_user = None
     mock_message.answer = mocker.AsyncMock()
 
     await manual_check(mock_message)
@@ -47,9 +57,11 @@ async def test_manual_check_text_only(mocker):
 @pytest.mark.asyncio
 async def test_manual_check_error_handling(mocker):
     mocker.patch(
-        "handlers.fetch_page_source", side_effect=RuntimeError("Redmine error")
+        "handlers.get_report_snapshot_async", side_effect=RuntimeError("Redmine error")
     )
     mock_message = mocker.Mock(spec=Message)
+    mock_message.chat = mocker.Mock(id=-1, type="group")
+    mock_message.from_user = None
     mock_message.answer = mocker.AsyncMock()
 
     mocker.patch("handlers.t", return_value="Ошибка")
@@ -0,0 +1,63 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from history import HoursHistory
+from hours_matrix import HoursMatrix
+
+END = date(2025, 6, 6)  # Friday
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = HoursHistory(str(tmp_path / "hours.db"))
+    yield history
+    history.close()
+
+
+def _matrix(rows):
+    return HoursMatrix.from_rows((name, [*days, sum(days)]) for name, days in rows)
+
+
+def test_record_upserts_only_changed_cells(history):
+    first = _matrix([("Alice", [8, 8, 0]), ("Bob", [4, 0, 4])])
+    assert history.record(first, END) == 4
+    assert history.record(first, END) == 0
+    changed = _matrix([("Alice", [8, 7.5, 0]), ("Bob", [4, 0, 0])])
+    assert history.record(changed, END) == 2
+    stored = history.hours(date(2025, 6, 4), END, ["Alice", "Bob"])
+    np.testing.assert_array_equal(stored.days, [[8, 7.5, 0], [4, 0, 0]])
+    np.testing.assert_array_equal(stored.totals, [15.5, 4])
+
+
+def test_moving_window_keeps_older_days(history):
+    history.record(_matrix([("Alice", [1, 2, 3])]), date(2025, 6, 4))
+    history.record(_matrix([("Alice", [3, 4, 5])]), END)
+    stored = history.hours(date(2025, 6, 2), END)
+    assert stored.names == ("Alice",)
+    np.testing.assert_array_equal(stored.days, [[1, 2, 3, 4, 5]])
+
+
+def test_weekly_totals(history):
+    history.record(_matrix([("Alice", [8] * 14)]), END)
+    weeks, totals = history.weekly_totals(date(2025, 5, 26), END)
+    assert weeks == [date(2025, 5, 26), date(2025, 6, 2)]
+    np.testing.assert_array_equal(totals.days, [[8 * 7, 8 * 5]])
+
+
+def test_empty_report_and_disabled_store_are_ignored(history):
+    assert history.record(HoursMatrix.from_rows([]), END) == 0
+    disabled = HoursHistory(path=None)
+    assert disabled.record(_matrix([("Alice", [8])]), END) == 0
+    assert len(disabled.hours(END, END)) == 0
+
+
+def test_record_scoped_to_employees_keeps_other_teams(history):
+    history.record(_matrix([("Alice", [8, 8, 8])]), END, ["Alice"])
+    history.record(_matrix([("Bob", [4, 4, 4])]), END, ["Bob"])
+    stored = history.hours(date(2025, 6, 4), END)
+    assert stored.names == ("Alice", "Bob")
+    assert history.record(_matrix([("Bob", [4, 0, 4])]), END, ["Bob"]) == 1
+    stored = history.hours(date(2025, 6, 4), END)
+    np.testing.assert_array_equal(stored.days, [[8, 8, 8], [4, 0, 4]])
@@ -0,0 +1,33 @@
+import numpy as np
+
+from hours_matrix import HoursMatrix, format_hours
+
+
+def test_coerce_legacy_strings():
+    matrix = HoursMatrix.coerce({"Alice": ["2", "7.5", "9.5"], "Bob": ["", "8"]})
+    assert matrix.names == ("Alice", "Bob")
+    assert matrix.days.tolist() == [[2.0, 7.5], [0.0, 0.0]]
+    assert matrix.totals.tolist() == [9.5, 8.0]
+    assert matrix.days_count == 2
+
+
+def test_select_and_index():
+    matrix = HoursMatrix.from_rows([("Alice", [1, 2, 3]), ("Bob", [4, 5, 9])])
+    assert "Bob" in matrix
+    selected = matrix.select(["Bob", "Unknown"])
+    assert selected.names == ("Bob",)
+    assert np.array_equal(selected.days, [[4.0, 5.0]])
+    assert selected.to_strings() == {"Bob": ["4", "5", "9"]}
+
+
+def test_empty_matrix():
+    matrix = HoursMatrix.from_rows([])
+    assert len(matrix) == 0
+    assert not matrix
+    assert matrix.totals.shape == (0,)
+
+
+def test_format_hours():
+    assert format_hours(8.0) == "8"
+    assert format_hours(7.5) == "7.5"
+    assert format_hours(1 / 3) == "0.33"
@@ -0,0 +1,42 @@
+from llm_cache import LLMCache, cache_key
+
+
+def test_key_normalizes_whitespace_and_case():
+    question = [{"role": "user", "content": "How do I log hours?"}]
+    repeat = [{"role": "user", "content": " how do i  log\nhours? "}]
+    assert cache_key("m", None, question) == cache_key("m", None, repeat)
+    assert cache_key("m", None, question) != cache_key("other", None, question)
+    assert cache_key("m", None, question) != cache_key("m", "system", question)
+
+
+def test_lru_eviction_and_hit_rate():
+    cache = LLMCache(max_entries=2, path=None)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    cache.put("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+    assert cache.hit_rate == 2 / 3
+
+
+def test_entries_expire(mocker):
+    clock = mocker.patch("llm_cache.time.time", return_value=1000.0)
+    cache = LLMCache(ttl=60, path=None)
+    cache.put("a", "1")
+    clock.return_value = 1061.0
+    assert cache.get("a") is None
+
+
+def test_disk_tier_survives_restart_and_is_bounded(tmp_path):
+    path = str(tmp_path / "llm_cache.db")
+    cache = LLMCache(max_entries=1, path=path, max_disk_entries=2)
+    for key in "abc":
+        cache.put(key, key.upper())
+    cache.close()
+
+    reopened = LLMCache(max_entries=1, path=path, max_disk_entries=2)
+    assert reopened.get("a") is None
+    assert reopened.get("b") == "B"
+    assert reopened.get("c") == "C"
+    reopened.close()
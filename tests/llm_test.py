@@ -0,0 +1,172 @@
+import asyncio
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from llm import LLMClient, LLMRequestSuperseded
+from llm_cache import LLMCache
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length))
+        with self.lock:
+            FakeOllamaHandler.active += 1
+            FakeOllamaHandler.peak = max(FakeOllamaHandler.peak, self.active)
+        try:
+            if self.path == "/api/chat":
+                prompt = request["messages"][-1]["content"]
+                body = {"message": {"role": "assistant", "content": f"echo: {prompt}"}}
+            else:
+                prompt = request["prompt"]
+                body = {"response": f"generated: {prompt}"}
+            if prompt.startswith("slow"):
+                time.sleep(0.3)
+            body.update(model=request["model"], done=True)
+            if request.get("stream"):
+                self._stream(request["model"], body["message"]["content"])
+                return
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        finally:
+            with self.lock:
+                FakeOllamaHandler.active -= 1
+
+    def _stream(self, model, content):
+        lines = [
+            {"model": model, "message": {"role": "assistant", "content": word}}
+            for word in re.findall(r"\S+\s*", content)
+        ]
+        lines.append(
+            {
+                "model": model,
+                "message": {"role": "assistant", "content": ""},
+                "done": True,
+            }
+        )
+        payload = "".join(json.dumps(line) + "\n" for line in lines).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture(scope="module")
+def fake_ollama():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllamaHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def reset_peak():
+    FakeOllamaHandler.peak = 0
+
+
+@pytest.mark.asyncio
+async def test_chat_and_generate(fake_ollama):
+    client = LLMClient(host=fake_ollama, cache=None)
+    try:
+        messages = [{"role": "user", "content": "hi"}]
+        assert await client.chat("m", messages) == "echo: hi"
+        assert await client.generate("m", "praise", system="s") == "generated: praise"
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_reports_growing_text(fake_ollama):
+    client = LLMClient(host=fake_ollama, cache=None)
+    seen = []
+
+    async def on_text(text):
+        seen.append(text)
+
+    try:
+        messages = [{"role": "user", "content": "a b"}]
+        text = await client.chat_stream("m", messages, on_text)
+        assert text == "echo: a b"
+        assert seen == ["echo: ", "echo: a ", "echo: a b"]
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_capped_per_model(fake_ollama):
+    client = LLMClient(host=fake_ollama, max_concurrency=1, cache=None)
+    try:
+        await asyncio.gather(*(client.generate("m", f"slow {i}") for i in range(3)))
+        assert FakeOllamaHandler.peak == 1
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_new_request_cancels_previous_for_same_key(fake_ollama):
+    client = LLMClient(host=fake_ollama, cache=None)
+    try:
+        first = asyncio.create_task(
+            client.chat("m", [{"role": "user", "content": "slow one"}], key=1)
+        )
+        await asyncio.sleep(0.05)
+        second = await client.chat("m", [{"role": "user", "content": "two"}], key=1)
+        assert second == "echo: two"
+        with pytest.raises(LLMRequestSuperseded):
+            await first
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_timeout(fake_ollama):
+    client = LLMClient(host=fake_ollama, timeout=0.1, cache=None)
+    try:
+        with pytest.raises(TimeoutError):
+            await client.generate("m", "slow")
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_repeated_prompt_is_answered_from_cache(fake_ollama):
+    cache = LLMCache(max_entries=8, path=None)
+    client = LLMClient(host=fake_ollama, cache=cache)
+    try:
+        question = [{"role": "user", "content": "How do I log hours?"}]
+        first = await client.chat("m", question)
+        await client.close()
+        client.host = "http://127.0.0.1:9"
+        repeat = [{"role": "user", "content": "  how do I   log hours? "}]
+        assert await client.chat("m", repeat) == first
+        seen = []
+
+        async def on_text(text):
+            seen.append(text)
+
+        assert await client.chat_stream("m", question, on_text) == first
+        assert seen == [first]
+        assert cache.hits == 2
+        with pytest.raises(ConnectionError):
+            await client.chat("m", question, use_cache=False)
+    finally:
+        await client.close()
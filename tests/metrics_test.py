@@ -0,0 +1,46 @@
+import socket
+
+import aiohttp
+import pytest
+from prometheus_client import CollectorRegistry, Counter
+
+from metrics import start_metrics_server
+
+
+@pytest.fixture
+def registry():
+    return CollectorRegistry()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.mark.asyncio
+async def test_server_exposes_metrics_and_health(registry):
+    Counter("requests", "Requests.", registry=registry).inc()
+    healthy = [True]
+    port = _free_port()
+    runner = await start_metrics_server(
+        lambda: healthy[0], "127.0.0.1", port, registry=registry
+    )
+    try:
+        async with aiohttp.ClientSession(f"http://127.0.0.1:{port}") as session:
+            async with session.get("/metrics") as response:
+                assert response.status == 200
+                assert response.headers["Content-Type"].startswith("text/plain")
+                assert "requests_total 1.0" in await response.text()
+            async with session.get("/healthz") as response:
+                assert response.status == 200
+            healthy[0] = False
+            async with session.get("/healthz") as response:
+                assert response.status == 503
+    finally:
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_server_disabled_without_port(registry):
+    assert await start_metrics_server(lambda: True, port=0, registry=registry) is None
@@ -1,8 +1,9 @@
-from datetime import date
+from datetime import date, timedelta
 
 import pytest
 from parser import (
     extract_last_level_rows,
+    parse_report,
     parse_time_entries,
     _adjust_rate_for_vacation,
     _is_employee_on_full_vacation,
@@ -11,6 +12,8 @@ from parser import (
 )
 from config import EMPLOYEES
 from schema import EmployeeData
+from translations import t
+from work_calendar import WorkCalendar
 
 
 @pytest.fixture
@@ -60,10 +63,59 @@ def test_generate_report_format():
     assert "10" in report
 
 
-def test_find_underworked_employee(monkeypatch):
+REPORT_END = date(2025, 6, 6)  # Friday
+
+
+@pytest.fixture
+def fixed_calendar(monkeypatch):
+    # Report window ending on a known Friday, without holidays
+    monkeypatch.setattr(
+        "parser._report_calendar",
+        lambda days: WorkCalendar(
+            REPORT_END - timedelta(days=days - 1), REPORT_END, holidays=()
+        ),
+    )
+
+
+def test_find_underworked_employee(monkeypatch, fixed_calendar):
     EMPLOYEES["Eve"] = EmployeeData(tg="@eve", rate=1.0)
     monkeypatch.setattr("parser.random.uniform", lambda *args, **kwargs: 1.0)
-    monkeypatch.setattr("parser._is_employee_on_full_vacation", lambda *a, **kw: False)
     hours_data = {"Eve": ["1", "2", "3", "4", "5", "6", "10"]}
     result = _find_underworked_employees(hours_data, 7)
     assert "@eve" in result
+
+
+def test_parse_report_single_pass_rows():
+    html = """
+    <html><body><table>
+        <tr class="total"><td class="name">Total</td></tr>
+        <tr class="last-level">
+            <td class="name"><a href="/users/1">Bob  Stone</a></td>
+            <td class="hours"><span class="hours hours-int">7</span><span class="hours hours-dec">:30</span></td>
+            <td class="hours"></td>
+            <td class="hours"><span class="hours hours-int">8</span><span class="hours hours-dec">.25</span></td>
+        </tr>
+    </table></body></html>
+    """
+    rows = parse_report(html)
+    assert [row.name for row in rows] == ["Bob Stone"]
+    assert rows[0].hours == (7.5, 0.0, 8.25)
+    start, end = rows[0].span
+    assert html[start:end].startswith('<tr class="last-level">')
+    assert html[start:end].endswith("</tr>")
+
+
+def test_extract_last_level_rows_no_rows():
+    assert extract_last_level_rows("<html></html>") == t("no_data")
+
+
+def test_find_underworked_employee_fractional_hours(monkeypatch, fixed_calendar):
+    # 22.5 h is short of a full week's 30 h, but enough for 3 of 5 workdays
+    EMPLOYEES["Frank"] = EmployeeData(tg="@frank", rate=1.0)
+    monkeypatch.setattr("parser.random.uniform", lambda *args, **kwargs: 1.0)
+    hours_data = {"Frank": ["7.5", "7.5", "7.5", "0", "0", "22.5"]}
+    assert "@frank" in _find_underworked_employees(hours_data, 5)
+    EMPLOYEES["Frank"] = EmployeeData(
+        tg="@frank", rate=1.0, vacation_range=[date(2025, 6, 5), date(2025, 6, 6)]
+    )
+    assert "@frank" not in _find_underworked_employees(hours_data, 5)
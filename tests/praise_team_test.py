@@ -1,12 +1,56 @@
-from unittest.mock import Mock, patch
+from collections import deque
+from unittest.mock import AsyncMock, patch
 
+import pytest
+
+import translations
+from praise_pool import PraisePool, generate_praise
 from praise_team import praise_team
+from translations import t
 
 
-def test_praise_team_successful_ollama_response():
-    mock_response = Mock()
-    mock_response.response = "Excellent work, team! 🚀"
-    with patch("ollama.generate", return_value=mock_response):
-        result = praise_team()
+@pytest.mark.asyncio
+async def test_praise_team_successful_ollama_response():
+    generate = AsyncMock(return_value="Excellent work, team! 🚀")
+    with patch("praise_pool.llm_client.generate", generate):
+        result = await generate_praise("en")
         assert isinstance(result, str)
         assert len(result) > 0
+    generate.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_praise_team_pops_pool_without_model(tmp_path):
+    pool = PraisePool(str(tmp_path / "praise.json"), size=2)
+    pool.pools[translations.current_language] = deque(["First 🚀", "Second 🎉"])
+    generate = AsyncMock()
+    with (
+        patch("praise_team.praise_pool", pool),
+        patch("praise_pool.llm_client.generate", generate),
+    ):
+        assert await praise_team() == "First 🚀"
+        assert await praise_team() == "Second 🎉"
+        assert await praise_team() in t("phrases")
+    generate.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_refill_tops_up_and_persists(tmp_path):
+    path = str(tmp_path / "praise.json")
+    pool = PraisePool(path, size=3)
+    pool.pools["en"] = deque(["Kept"])
+    generate = AsyncMock(side_effect=["New one", "New one", "", "Another"])
+    with patch("praise_pool.llm_client.generate", generate):
+        assert await pool.refill("en") == 2
+    reloaded = PraisePool(path, size=3)
+    assert list(reloaded.pools["en"]) == ["Kept", "New one", "Another"]
+    assert reloaded.pop("ru") is None
+
+
+@pytest.mark.asyncio
+async def test_refill_stops_when_model_is_unavailable(tmp_path):
+    pool = PraisePool(str(tmp_path / "praise.json"), size=5)
+    generate = AsyncMock(side_effect=["Great job", ConnectionError("down")])
+    with patch("praise_pool.llm_client.generate", generate):
+        assert await pool.refill("en") == 1
+    assert pool.available("en") == 1
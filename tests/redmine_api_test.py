@@ -0,0 +1,106 @@
+import json
+import threading
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from config import EMPLOYEES
+from redmine_api import TimeEntrySync, build_work_hours, fetch_time_entries
+from schema import EmployeeData
+
+API_KEY = "stub-key"
+FROM_DATE = date(2025, 5, 19)
+TO_DATE = date(2025, 5, 21)
+
+
+def make_entry(entry_id, name, spent_on, hours):
+    return {
+        "id": entry_id,
+        "user": {"id": 1, "name": name},
+        "spent_on": spent_on.isoformat(),
+        "hours": hours,
+    }
+
+
+ENTRIES = [
+    make_entry(i, "John Doe", FROM_DATE + timedelta(days=i % 3), 1.0)
+    for i in range(250)
+]
+
+
+class StubApiHandler(BaseHTTPRequestHandler):
+    requests: list[dict] = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        StubApiHandler.requests.append(query)
+        if self.headers.get("X-Redmine-API-Key") != API_KEY:
+            self.send_response(401)
+            self.end_headers()
+            return
+        entries = ENTRIES[:1] if "updated_on" in query else ENTRIES
+        offset, limit = int(query["offset"]), int(query["limit"])
+        body = json.dumps(
+            {
+                "time_entries": entries[offset : offset + limit],
+                "total_count": len(entries),
+                "offset": offset,
+                "limit": limit,
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def stub_api():
+    StubApiHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubApiHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def employees(mocker):
+    mocker.patch.dict(EMPLOYEES, {"John Doe": EmployeeData(tg="@johndoe")})
+
+
+def test_fetch_time_entries_paginates(stub_api):
+    entries = fetch_time_entries(FROM_DATE, TO_DATE, base_url=stub_api, api_key=API_KEY)
+    assert len(entries) == 250
+    assert sorted(int(r["offset"]) for r in StubApiHandler.requests) == [0, 100, 200]
+    assert StubApiHandler.requests[0]["from"] == "2025-05-19"
+
+
+def test_build_work_hours_keeps_fractional_hours():
+    entries = [
+        make_entry(1, "John Doe", FROM_DATE, 7.5),
+        make_entry(2, "John Doe", TO_DATE, 8),
+        make_entry(3, "Stranger", FROM_DATE, 8),
+    ]
+    work_hours = build_work_hours(entries, FROM_DATE, TO_DATE)
+    assert work_hours.names == ("John Doe",)
+    assert work_hours.days.tolist() == [[7.5, 0.0, 8.0]]
+    assert work_hours.totals.tolist() == [15.5]
+
+
+def test_incremental_sync_requests_only_updated_entries(stub_api):
+    sync = TimeEntrySync(base_url=stub_api, api_key=API_KEY)
+    first = sync.sync(FROM_DATE, TO_DATE)
+    assert first.totals.tolist() == [250.0]
+    StubApiHandler.requests = []
+    second = sync.sync(FROM_DATE, TO_DATE)
+    assert second == first
+    assert len(StubApiHandler.requests) == 1
+    assert StubApiHandler.requests[0]["updated_on"].startswith(">=")
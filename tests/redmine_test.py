@@ -0,0 +1,162 @@
+import pytest
+from prometheus_client import REGISTRY
+from selenium.common.exceptions import TimeoutException
+
+import redmine
+from benchmarks.stub_redmine import LOGIN_HTML, StubRedmine
+from redmine import (
+    DriverPool,
+    FetchResult,
+    FetchTimings,
+    RedmineFetchError,
+    fetch_page_source,
+    fetch_report,
+    fetch_report_http,
+)
+
+REPORT_HTML = (
+    '<table><tr class="last-level"><td class="name">John Doe</td></tr></table>'
+)
+
+
+@pytest.fixture(scope="module")
+def stub_redmine():
+    report = {"/report": REPORT_HTML.encode()}.get
+    with StubRedmine(report, username="user", password="secret") as server:
+        yield server.url
+
+
+def test_http_fetcher_logs_in_and_downloads_report(stub_redmine):
+    result = fetch_report_http(
+        report_url=f"{stub_redmine}/report",
+        login_url=f"{stub_redmine}/login",
+        username="user",
+        password="secret",
+    )
+    assert result.page_source == REPORT_HTML
+    assert result.timings.backend == "http"
+    assert result.timings.page_bytes == len(REPORT_HTML)
+    assert result.timings.login > 0
+    assert result.timings.report_load > 0
+
+
+def test_http_fetcher_rejected_login(stub_redmine):
+    with pytest.raises(RedmineFetchError, match="login rejected"):
+        fetch_report_http(
+            report_url=f"{stub_redmine}/report",
+            login_url=f"{stub_redmine}/login",
+            username="user",
+            password="wrong",
+        )
+
+
+def test_http_fetcher_rejects_login_page_as_report():
+    login_page = {"/report": LOGIN_HTML.encode()}.get
+    with StubRedmine(login_page, username="user", password="secret") as server:
+        with pytest.raises(RedmineFetchError, match="session was not accepted"):
+            fetch_report_http(
+                report_url=f"{server.url}/report",
+                login_url=server.login_url,
+                username="user",
+                password="secret",
+            )
+
+
+def test_fetch_page_source_falls_back_to_selenium(mocker):
+    mocker.patch("redmine.REDMINE_FETCHER", "http")
+    mocker.patch.dict(
+        redmine.FETCHERS, {"http": mocker.Mock(side_effect=RedmineFetchError("x"))}
+    )
+    selenium = mocker.patch(
+        "redmine.fetch_report_selenium",
+        return_value=FetchResult("<html>selenium</html>", FetchTimings("selenium")),
+    )
+    assert fetch_page_source("http://report") == "<html>selenium</html>"
+    selenium.assert_called_once_with("http://report")
+
+
+def test_fetch_report_records_timings(mocker):
+    timings = FetchTimings("http", login=0.2, report_load=0.5, page_bytes=10)
+    mocker.patch.dict(
+        redmine.FETCHERS,
+        {"http": mocker.Mock(return_value=FetchResult("<html/>", timings))},
+    )
+    mocker.patch("redmine.REDMINE_FETCHER", "http")
+
+    def sample(name, **labels):
+        return REGISTRY.get_sample_value(name, {"backend": "http", **labels}) or 0
+
+    logins = sample("labor_costs_fetch_phase_seconds_sum", phase="login")
+    pages = sample("labor_costs_fetch_page_bytes_count")
+    fetch_report("http://report")
+    assert sample(
+        "labor_costs_fetch_phase_seconds_sum", phase="login"
+    ) == pytest.approx(logins + 0.2)
+    assert sample("labor_costs_fetch_page_bytes_count") == pages + 1
+    assert timings.as_dict()["total"] == pytest.approx(0.7)
+
+
+class FakeDriver:
+    def __init__(self, healthy=True, heap=0):
+        self.healthy = healthy
+        self.heap = heap
+        self.quit_called = False
+
+    def execute_script(self, script):
+        if not self.healthy:
+            raise RuntimeError("chrome not reachable")
+        return self.heap if "usedJSHeapSize" in script else 1
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_driver_pool_reuses_session():
+    drivers = [FakeDriver(), FakeDriver()]
+    pool = DriverPool(size=1, max_uses=10, factory=iter(drivers).__next__)
+    with pool.session() as first:
+        pass
+    with pool.session() as second:
+        pass
+    assert first is second is drivers[0]
+    assert not drivers[0].quit_called
+    pool.close()
+    assert drivers[0].quit_called
+
+
+def test_driver_pool_recycles_after_max_uses_and_heap_growth():
+    drivers = [FakeDriver(), FakeDriver(heap=2 * 1024 * 1024), FakeDriver()]
+    pool = DriverPool(size=1, max_uses=2, max_heap_mb=1, factory=iter(drivers).__next__)
+    for _ in range(2):
+        with pool.session():
+            pass
+    assert drivers[0].quit_called
+    with pool.session() as driver:
+        assert driver is drivers[1]
+    assert drivers[1].quit_called
+    with pool.session() as driver:
+        assert driver is drivers[2]
+
+
+def test_driver_pool_replaces_unhealthy_and_failed_sessions():
+    drivers = [FakeDriver(), FakeDriver(), FakeDriver()]
+    pool = DriverPool(size=1, factory=iter(drivers).__next__)
+    with pool.session():
+        pass
+    drivers[0].healthy = False
+    with pytest.raises(RuntimeError):
+        with pool.session() as driver:
+            assert driver is drivers[1]
+            raise RuntimeError("page crashed")
+    assert drivers[1].quit_called
+    with pool.session() as driver:
+        assert driver is drivers[2]
+
+
+def test_selenium_timeout_raises(mocker):
+    pool = DriverPool(size=1, factory=FakeDriver)
+    mocker.patch("redmine.driver_pool", pool)
+    mocker.patch("redmine._load_report", side_effect=TimeoutException("slow"))
+    with pytest.raises(RedmineFetchError):
+        redmine.fetch_report_selenium("http://report")
+    pool.close()
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+
+import pytest
+from prometheus_client import REGISTRY
+
+import snapshot
+from config import EMPLOYEES
+from schema import EmployeeData
+from hours_matrix import HoursMatrix
+from teams import Team
+from snapshot import (
+    ReportSnapshot,
+    get_report_snapshot,
+    get_report_snapshot_async,
+    invalidate_report_snapshot,
+)
+
+
+ROW_HTML = """
+<table>
+    <tr class="last-level">
+        <td class="name">John Doe</td>
+        <td class="hours"><span class="hours-int">8</span></td>
+        <td class="hours"><span class="hours-int">8</span></td>
+    </tr>
+</table>
+"""
+
+
+@pytest.fixture(autouse=True)
+def employees(mocker):
+    mocker.patch.dict(EMPLOYEES, {"John Doe": EmployeeData(tg="@johndoe")})
+    invalidate_report_snapshot()
+
+
+def test_snapshot_reused_within_max_age(mocker):
+    fetch = mocker.patch("snapshot.fetch_page_source", return_value=ROW_HTML)
+    first = get_report_snapshot(max_age=60)
+    second = get_report_snapshot(max_age=60)
+    assert first is second
+    assert first.work_hours.to_strings() == {"John Doe": ["8", "8"]}
+    fetch.assert_called_once()
+
+
+def test_snapshot_refetched_when_stale(mocker):
+    fetch = mocker.patch("snapshot.fetch_page_source", return_value=ROW_HTML)
+    get_report_snapshot(max_age=60)
+    get_report_snapshot(max_age=0)
+    assert fetch.call_count == 2
+
+
+def test_empty_snapshot_not_cached(mocker):
+    fetch = mocker.patch("snapshot.fetch_page_source", return_value="<html></html>")
+    assert len(get_report_snapshot(max_age=60).work_hours) == 0
+    get_report_snapshot(max_age=60)
+    assert fetch.call_count == 2
+    assert snapshot._snapshots == {}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_async_requests_share_one_fetch(mocker):
+    release = threading.Event()
+
+    def slow_fetch(report_url):
+        release.wait(5)
+        return ROW_HTML
+
+    fetch = mocker.patch("snapshot.fetch_page_source", side_effect=slow_fetch)
+    waiters = [
+        asyncio.create_task(get_report_snapshot_async(max_age=60)) for _ in range(5)
+    ]
+    await asyncio.sleep(0.05)
+    release.set()
+    results = await asyncio.gather(*waiters)
+    assert fetch.call_count == 1
+    assert all(result is results[0] for result in results)
+    assert await get_report_snapshot_async(max_age=60) is results[0]
+    assert fetch.call_count == 1
+
+
+def test_hours_for_telegram_slices_snapshot():
+    EMPLOYEES["Jane Smith"] = EmployeeData(tg="@JaneSmith")
+    snapshot = ReportSnapshot(
+        HoursMatrix.coerce({"John Doe": ["8", "8"], "Jane Smith": ["4", "4"]}), 0.0
+    )
+    jane = snapshot.hours_for_telegram("janesmith")
+    assert jane is not None
+    assert jane.names == ("Jane Smith",)
+    assert jane.totals.tolist() == [4.0]
+    assert snapshot.hours_for_telegram("@johndoe").names == ("John Doe",)
+    assert snapshot.hours_for_telegram("stranger") is None
+    assert snapshot.names_by_telegram is snapshot.names_by_telegram
+
+
+def test_teams_have_separate_snapshots(mocker):
+    pages = {
+        "http://redmine/a": ROW_HTML,
+        "http://redmine/b": ROW_HTML.replace("John Doe", "Jane Smith"),
+    }
+    fetch = mocker.patch("snapshot.fetch_page_source", side_effect=pages.get)
+    team_a = Team("a", "http://redmine/a", "-1", EMPLOYEES)
+    team_b = Team("b", "http://redmine/b", "-2", {"Jane Smith": EmployeeData(tg="@js")})
+    first = get_report_snapshot(max_age=60, team=team_a)
+    second = get_report_snapshot(max_age=60, team=team_b)
+    assert first.work_hours.names == ("John Doe",)
+    assert second.work_hours.names == ("Jane Smith",)
+    assert second.hours_for_telegram("js").names == ("Jane Smith",)
+    assert second.hours_for_telegram("johndoe") is None
+    invalidate_report_snapshot(team_a)
+    get_report_snapshot(max_age=60, team=team_a)
+    assert get_report_snapshot(max_age=60, team=team_b) is second
+    assert fetch.call_count == 3
+
+
+def test_fetch_failure_counted(mocker):
+    mocker.patch("snapshot.fetch_page_source", side_effect=RuntimeError("down"))
+
+    def failures():
+        return REGISTRY.get_sample_value(
+            "labor_costs_redmine_failures_total", {"source": "html"}
+        )
+
+    before = failures() or 0
+    with pytest.raises(RuntimeError):
+        get_report_snapshot(max_age=60)
+    assert failures() == before + 1
+    assert REGISTRY.get_sample_value("labor_costs_inflight_fetches") == 0
+
+
+def test_history_recorded_only_for_api_source(mocker):
+    record = mocker.patch("snapshot.hours_history.record", return_value=0)
+    mocker.patch("snapshot.fetch_page_source", return_value=ROW_HTML)
+    get_report_snapshot(max_age=0)
+    record.assert_not_called()
+
+    mocker.patch("snapshot.TIME_ENTRY_SOURCE", "api")
+    fetch = mocker.patch(
+        "snapshot.fetch_work_hours",
+        return_value=HoursMatrix.coerce({"John Doe": ["8", "8"]}),
+    )
+    get_report_snapshot(max_age=0)
+    to_date = fetch.call_args.kwargs["to_date"]
+    assert record.call_args.args[1] == to_date
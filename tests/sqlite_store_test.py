@@ -0,0 +1,24 @@
+from sqlite_store import SQLiteStore
+
+
+class NotesStore(SQLiteStore):
+    schema = "CREATE TABLE IF NOT EXISTS notes (text TEXT NOT NULL);"
+    prepared = 0
+
+    def _prepare(self, connection):
+        self.prepared += 1
+
+
+def test_connect_applies_pragmas_and_schema_once(tmp_path):
+    store = NotesStore(str(tmp_path / "notes.db"))
+    connection = store._connect()
+    assert store._connect() is connection
+    assert store.prepared == 1
+    assert connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    assert connection.execute("PRAGMA synchronous").fetchone() == (1,)
+    assert connection.execute("PRAGMA busy_timeout").fetchone() == (5000,)
+    connection.execute("INSERT INTO notes (text) VALUES ('a')")
+    store.close()
+    assert store._connection is None
+    assert store._connect().execute("SELECT text FROM notes").fetchall() == [("a",)]
+    store.close()
@@ -0,0 +1,39 @@
+import subprocess
+import sys
+
+import startup
+
+HEAVY_MODULES = (
+    "matplotlib",
+    "ollama",
+    "httpx",
+    "webdriver_manager",
+    "selenium.webdriver.remote.webdriver",
+)
+
+
+def test_import_times_lists_direct_imports():
+    names = [name for name, _ in startup.import_times("tomllib")]
+    assert names
+    assert "tomllib" in names
+    assert "encodings" not in names
+
+
+def test_bot_import_defers_heavy_dependencies():
+    code = (
+        "import sys, bot, config; "
+        f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules]); "
+        "print('EMPLOYEES' in vars(config))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.split("\n")[:2] == ["[]", "False"]
+
+
+def test_startup_report_includes_phases(mocker):
+    mocker.patch("startup.import_times", return_value=[("aiogram", 1.5)])
+    startup.mark("polling")
+    report = startup.startup_report()
+    assert "polling" in report
+    assert "aiogram" in report
@@ -0,0 +1,68 @@
+from unittest import mock
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import EditMessageText
+from aiogram.types import Message
+
+from streaming import StreamingReply, split_message
+
+
+def test_split_message_prefers_line_breaks():
+    text = "first line\nsecond line"
+    assert split_message(text, limit=15) == ["first line", "second line"]
+    assert "\n".join(split_message(text, limit=15)) == text
+
+
+def test_split_message_hard_cut_without_breaks():
+    assert split_message("x" * 10, limit=4) == ["xxxx", "xxxx", "xx"]
+    assert split_message("short") == ["short"]
+
+
+def _message():
+    message = mock.Mock(spec=Message)
+    reply = mock.Mock(spec=Message)
+    reply.edit_text = mock.AsyncMock()
+    message.answer = mock.AsyncMock(return_value=reply)
+    return message, reply
+
+
+@pytest.mark.asyncio
+async def test_updates_are_throttled_and_finish_shows_full_text():
+    message, reply = _message()
+    streaming = StreamingReply(message, interval=60)
+    await streaming.update("Hel")
+    await streaming.update("Hello")
+    await streaming.update("Hello, wor")
+    message.answer.assert_awaited_once_with("Hel")
+    reply.edit_text.assert_not_awaited()
+    await streaming.finish("Hello, world")
+    reply.edit_text.assert_awaited_once_with("Hello, world")
+
+
+@pytest.mark.asyncio
+async def test_long_answer_continues_in_new_message():
+    message, reply = _message()
+    streaming = StreamingReply(message, interval=0, limit=10)
+    await streaming.update("short")
+    await streaming.finish("short text\nand more")
+    reply.edit_text.assert_awaited_once_with("short text")
+    assert message.answer.await_args_list[-1].args == ("and more",)
+    assert streaming.shown == ["short text", "and more"]
+
+
+@pytest.mark.asyncio
+async def test_finish_waits_out_flood_control(mocker):
+    message, reply = _message()
+    sleep = mocker.patch("streaming.asyncio.sleep", new=mock.AsyncMock())
+    streaming = StreamingReply(message, interval=0)
+    await streaming.update("Hi")
+    reply.edit_text.side_effect = [
+        TelegramRetryAfter(
+            method=EditMessageText(text="Hi there"), message="flood", retry_after=3
+        ),
+        None,
+    ]
+    await streaming.finish("Hi there")
+    sleep.assert_awaited_once_with(3)
+    assert reply.edit_text.await_count == 2
@@ -0,0 +1,58 @@
+import asyncio
+import json
+
+import pytest
+
+from subscribers import Subscriber, SubscriberStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SubscriberStore(str(tmp_path / "subscribers.db"), legacy_json=None)
+    yield store
+    store.close()
+
+
+def test_upsert_and_lookup(store):
+    store.upsert(1, "alice", True)
+    store.upsert(1, "alice_new", False)
+    store.upsert(2, "bob", True)
+    assert store.find_by_username("alice_new") == Subscriber(1, "alice_new", False)
+    assert store.find_by_username("alice") is None
+    assert store.active_subscribers() == [Subscriber(2, "bob", True)]
+    assert store.count() == 1
+
+
+def test_wal_mode_and_username_index(store):
+    store.upsert(1, "alice", True)
+    connection = store._connect()
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    plan = connection.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM subscribers WHERE username = 'alice'"
+    ).fetchall()
+    assert "subscribers_username" in str(plan)
+
+
+def test_legacy_json_imported_once(tmp_path):
+    legacy = tmp_path / "subscribers.json"
+    legacy.write_text(
+        json.dumps({"364084685": {"subscribe": True, "username": "AydarVess"}}),
+        encoding="utf-8",
+    )
+    path = str(tmp_path / "subscribers.db")
+    store = SubscriberStore(path, legacy_json=str(legacy))
+    assert store.active_subscribers() == [Subscriber(364084685, "AydarVess", True)]
+    store.upsert(364084685, "AydarVess", False)
+    store.close()
+
+    reopened = SubscriberStore(path, legacy_json=str(legacy))
+    assert reopened.active_subscribers() == []
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_upserts_are_not_lost(store):
+    await asyncio.gather(
+        *(store.upsert_async(user_id, f"user{user_id}", True) for user_id in range(200))
+    )
+    assert len(await store.active_subscribers_async()) == 200
@@ -0,0 +1,82 @@
+from typing import Any
+
+import pytest
+from pydantic import ValidationError
+
+import config
+import teams
+from schema import ConfigModel
+from teams import DEFAULT_TEAM, load_teams, team_for_chat
+
+TEAMS_CONFIG: dict[str, Any] = {
+    "teams": [
+        {
+            "name": "backend",
+            "report_url": "http://redmine/backend",
+            "chat_id": -100,
+            "employees": {"John Doe": {"tg": "@johndoe"}},
+            "schedule_time": "17:05",
+            "timezone": "Europe/Moscow",
+        },
+        {
+            "name": "frontend",
+            "report_url": "http://redmine/frontend",
+            "chat_id": "-200",
+            "employees": {"Jane Smith": {"tg": "@JaneSmith", "rate": 0.5}},
+            "schedule_days": "mon-thu",
+        },
+    ]
+}
+
+
+@pytest.fixture
+def multi_team(mocker):
+    mocker.patch.object(config, "config", ConfigModel(**TEAMS_CONFIG))
+    mocker.patch.object(teams, "_teams", None)
+    yield load_teams()
+
+
+def test_legacy_config_is_one_default_team(mocker):
+    mocker.patch.object(teams, "_teams", None)
+    (team,) = load_teams()
+    assert team.name == DEFAULT_TEAM
+    assert team.report_url == config.REPORT_URL
+    assert team.chat_id == config.TELEGRAM_CHAT_ID
+    assert team.employees is config.EMPLOYEES
+    assert team.schedule_time == config.SCHEDULE_TIME
+
+
+def test_teams_get_their_own_schedule(multi_team):
+    backend, frontend = multi_team
+    assert backend.chat_id == "-100"
+    assert (backend.schedule_time.hour, backend.schedule_time.minute) == (17, 5)
+    assert backend.schedule_time.timezone.zone == "Europe/Moscow"
+    assert backend.personal_schedule_time.timezone.zone == "Europe/Moscow"
+    assert frontend.schedule_time == config.SCHEDULE_TIME
+    assert frontend.schedule_days == "mon-thu"
+
+
+def test_all_employees_merges_teams():
+    model = ConfigModel(**TEAMS_CONFIG)
+    assert set(model.all_employees()) == {"John Doe", "Jane Smith"}
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {},
+        {"teams": [TEAMS_CONFIG["teams"][0], TEAMS_CONFIG["teams"][0]]},
+        {"teams": [{**TEAMS_CONFIG["teams"][0], "schedule_time": "25:00"}]},
+    ],
+)
+def test_invalid_team_config_rejected(data):
+    with pytest.raises(ValidationError):
+        ConfigModel(**data)
+
+
+def test_team_for_chat(multi_team):
+    backend, frontend = multi_team
+    assert team_for_chat(-200) is frontend
+    assert team_for_chat(42, "janesmith") is frontend
+    assert team_for_chat(42, "@JohnDoe") is backend
+    assert team_for_chat(42, "stranger") is backend
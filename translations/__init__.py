@@ -28,7 +28,7 @@ def set_language(lang: str):
 
 
 # Функция для получения перевода
-def t(key: str) -> str:
-    return TRANSLATIONS.get(current_language, {}).get(
+def t(key: str, lang: str | None = None) -> str:
+    return TRANSLATIONS.get(lang or current_language, {}).get(
         key, TRANSLATIONS[DEFAULT_LANGUAGE].get(key, f"[{key}]")
     )
@@ -0,0 +1,79 @@
+from collections.abc import Container, Sequence
+from datetime import date, timedelta
+from functools import lru_cache
+
+import holidays
+import numpy as np
+
+from schema import EmployeeData
+
+holidays_ru = holidays.country_holidays("RU")
+
+
+class WorkCalendar:
+    """Working-day prefix sums over a report window, holidays included."""
+
+    def __init__(self, start: date, end: date, holidays: Container[date] = holidays_ru):
+        self.start = start
+        self.end = end
+        self.days_count = max((end - start).days + 1, 0)
+        working_days = np.fromiter(
+            (
+                day.weekday() < 5 and day not in holidays
+                for day in (start + timedelta(days=i) for i in range(self.days_count))
+            ),
+            dtype=np.int32,
+            count=self.days_count,
+        )
+        self.prefix = np.concatenate(([0], np.cumsum(working_days)))
+
+    @property
+    def total_workdays(self) -> int:
+        return int(self.prefix[-1])
+
+    def _index(self, day: date) -> int:
+        return (day - self.start).days
+
+    def workdays(self, start: date, end: date) -> int:
+        first = min(max(self._index(start), 0), self.days_count)
+        last = min(max(self._index(end) + 1, first), self.days_count)
+        return int(self.prefix[last] - self.prefix[first])
+
+    def _vacation_bounds(
+        self, employees: Sequence[EmployeeData | None]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        # Day indexes relative to the window start; no vacation is an empty range
+        starts = np.ones(len(employees), dtype=np.int64)
+        ends = np.zeros(len(employees), dtype=np.int64)
+        for row, employee in enumerate(employees):
+            vacation_range = employee.vacation_range if employee else None
+            if vacation_range and len(vacation_range) == 2:
+                starts[row] = self._index(vacation_range[0])
+                ends[row] = self._index(vacation_range[1])
+        return starts, ends
+
+    def vacation_workdays(self, employees: Sequence[EmployeeData | None]) -> np.ndarray:
+        starts, ends = self._vacation_bounds(employees)
+        first = np.clip(starts, 0, self.days_count)
+        last = np.clip(ends + 1, first, self.days_count)
+        return self.prefix[last] - self.prefix[first]
+
+    def effective_rates(self, employees: Sequence[EmployeeData | None]) -> np.ndarray:
+        rates = np.array(
+            [employee.rate if employee else 1.0 for employee in employees],
+            dtype=np.float64,
+        )
+        total = self.total_workdays
+        if not total:
+            return rates
+        effective_workdays = np.maximum(1, total - self.vacation_workdays(employees))
+        return rates * (effective_workdays / total)
+
+    def on_full_vacation(self, employees: Sequence[EmployeeData | None]) -> np.ndarray:
+        starts, ends = self._vacation_bounds(employees)
+        return (starts <= 0) & (ends >= self.days_count - 1)
+
+
+@lru_cache(maxsize=32)
+def report_calendar(report_days_count: int, report_end: date) -> WorkCalendar:
+    return WorkCalendar(report_end - timedelta(days=report_days_count - 1), report_end)